@@ -1,17 +1,47 @@
+import argparse
 import os
-import requests
 import sys
-from time import sleep
+import time
+import subprocess
 import hashlib, random, string
+from concurrent.futures import ThreadPoolExecutor
 
-# Config: load from environment
+# Rating engine is imported once: caches, the Spotify token and HTTP pools stay warm across artists
+import sptnr
+
+parser = argparse.ArgumentParser(description="🎧 SPTNR batch runner – rate every Navidrome artist in-process")
+parser.add_argument("--dry-run", action="store_true", help="List the artists that would be rated")
+parser.add_argument("--sync", action="store_true", help="Push ratings to Navidrome after each artist")
+parser.add_argument("--force", action="store_true", help="Force re-scan of all tracks (override cache)")
+parser.add_argument("--verbose", action="store_true", help="Enable verbose debug output")
+parser.add_argument("--incremental", action="store_true", help="Only re-enrich new/changed albums")
+parser.add_argument("--workers", type=int, default=1, help="Concurrent per-track lookups within an album")
+parser.add_argument("--resume", action="store_true",
+                    help="Continue the last interrupted run: skip finished artists and albums")
+parser.add_argument("--artist-workers", type=int, default=2, help="Artists rated concurrently")
+parser.add_argument("--queue", action="store_true",
+                    help="Pull artists from the shared work queue (run on several hosts/containers at once)")
+parser.add_argument("--processes", type=int, default=1, help="With --queue: worker processes to start on this host")
+parser.add_argument("--reset-queue", action="store_true", help="With --queue: start a new pass over every artist")
+parser.add_argument("--queue-status", action="store_true", help="Print work queue and worker progress, then exit")
+parser.add_argument("--profile", action="store_true",
+                    help="cProfile each artist into data/profiles (rates one artist at a time)")
+parser.add_argument("--metrics-port", type=int, default=int(os.getenv("SPTNR_METRICS_PORT", "0")),
+                    help="Serve Prometheus metrics on this port (/metrics, /metrics.json)")
+args = parser.parse_args()
+
+# Child processes started by --processes only work the queue
+IS_QUEUE_CHILD = os.getenv("SPTNR_QUEUE_CHILD") == "1"
+
+if args.queue_status:
+    sptnr.print_queue_status()
+    sys.exit(0)
+
+# Config: load from environment (sptnr has already loaded .env)
 NAVIDROME_URL = os.getenv("NAV_BASE_URL")
 NAV_USER = os.getenv("NAV_USER")
 NAV_PASS = os.getenv("NAV_PASS")
 
-# Dry-run toggle
-DRY_RUN = "--dry-run" in sys.argv
-
 # Generate salted token for Subsonic auth
 SALT = ''.join(random.choices(string.ascii_letters + string.digits, k=6))
 TOKEN = hashlib.md5((NAV_PASS + SALT).encode("utf-8")).hexdigest()
@@ -27,34 +57,99 @@ params = {
 
 print("🔎 Fetching artist index from Navidrome...")
 try:
-    response = requests.get(f"{NAVIDROME_URL}/rest/getArtists.view", params=params)
+    response = sptnr.http_get("navidrome", f"{NAVIDROME_URL}/rest/getArtists.view", params=params)
     response.raise_for_status()
-    data = response.json()["artists"]["index"]
+    data = response.json()["subsonic-response"]["artists"]["index"]
 except Exception as e:
     print(f"❌ Failed to fetch artists: {e}")
     sys.exit(1)
 
-artist_list = []
+artist_map = {}
 
 for group in data:
     for artist in group.get("artist", []):
-        name = artist["name"]
-        artist_list.append(name)
+        artist_map[artist["name"]] = artist["id"]
+
+sptnr.save_artist_index(artist_map)
+artist_list = list(artist_map.keys())
 
-if DRY_RUN:
+if args.dry_run:
     print("\n📝 Dry run activated. Artists that would be rated:")
     for name in artist_list:
         print(f"– {name}")
     print(f"\n💡 Total: {len(artist_list)} artists")
     sys.exit(0)
 
-# Full rating pass
-for name in artist_list:
-    print(f"\n🎧 Rating: {name}")
+sptnr.require_spotify_credentials()
+sptnr.init_console()
+sptnr.HTTP_CACHE_REFRESH = args.force
+if args.metrics_port and not IS_QUEUE_CHILD:
+    sptnr.start_metrics_server(args.metrics_port)
+if args.profile:
+    # cProfile follows one thread at a time, so artists are rated one after another
+    sptnr.PROFILE_DIR = os.path.join(sptnr.DATA_DIR, "profiles")
+    args.artist_workers = 1
+
+
+def queue_worker_loop():
+    """
+    Lease artists until the queue is drained; waits while other workers still hold live leases.
+    Each artist-worker thread is its own queue worker, with its own leases and heartbeat.
+    """
+    stop_heartbeat = sptnr.start_queue_heartbeat()
     try:
-        os.system(f"python sptnr.py \"{name}\"")
-        sleep(1.5)
-    except Exception as err:
-        print(f"⚠️ Error rating {name}: {err}")
+        while True:
+            item = sptnr.lease_next_artist()
+            if item is None:
+                if sptnr.queue_has_active_leases():
+                    time.sleep(min(30, sptnr.QUEUE_HEARTBEAT_SECONDS))
+                    continue
+                return
+            name, artist_id = item
+            try:
+                sptnr.rate_one_artist(name, artist_id, sync=args.sync, verbose=args.verbose, force=args.force,
+                                      workers=args.workers, incremental=args.incremental)
+                sptnr.complete_artist(name)
+            except Exception as err:
+                failed.append(name)
+                print(f"⚠️ Error rating {name}: {err}")
+                sptnr.complete_artist(name, error=f"{type(err).__name__}: {err}")
+    finally:
+        stop_heartbeat.set()
+
+
+if args.queue:
+    # Shared work queue: leases + heartbeats, global per-provider budgets across all workers
+    failed = []
+    if not IS_QUEUE_CHILD:
+        sptnr.enqueue_artists(artist_map, reset=args.reset_queue)
+    sptnr.enable_global_rate_budgets()
+    sptnr.enable_worker_metrics()
+
+    children = []
+    if not IS_QUEUE_CHILD:
+        for _ in range(max(0, args.processes - 1)):
+            children.append(subprocess.Popen([sys.executable, os.path.abspath(__file__)] + sys.argv[1:],
+                                             env={**os.environ, "SPTNR_QUEUE_CHILD": "1"}))
+        print(f"👷 Worker {sptnr.WORKER_ID} started with {len(children)} extra process"
+              f"{'es' if len(children) != 1 else ''} on this host")
+
+    with ThreadPoolExecutor(max_workers=max(1, args.artist_workers), thread_name_prefix="sptnr-artist") as pool:
+        for _ in range(max(1, args.artist_workers)):
+            pool.submit(queue_worker_loop)
 
-print("\n✅ All artists rated.")
+    for child in children:
+        child.wait()
+    sptnr.print_queue_status()
+    sptnr.print_rate_limiter_state()
+    sptnr.print_stage_totals()
+    sptnr.print_metrics_summary(label="batch")
+    if failed:
+        print(f"\n⚠️ {len(failed)} artist{'s' if len(failed) != 1 else ''} failed: {', '.join(failed)}")
+else:
+    # Full rating pass: the same sorted, incremental-aware, journaled loop as `sptnr.py --batchrate`
+    resume_point, resume_artist = sptnr.find_resume_point() if args.resume else (None, None)
+    failed = sptnr.batch_rate(sync=args.sync, force=args.force, workers=args.workers,
+                              incremental=args.incremental, resume_from=resume_artist,
+                              resume_point=resume_point, artist_workers=args.artist_workers,
+                              verbose=args.verbose)
@@ -0,0 +1,470 @@
+"""
+🏁 SPTNR offline provider benchmark
+
+Runs sptnr's own batch pipeline (batch_rate → rate_artist → sync) against a local
+stand-in server that emulates the Spotify, Last.fm, MusicBrainz, Discogs, YouTube
+and Navidrome endpoints sptnr calls, with a synthetic discography, configurable
+latency and injected 429s. Stage timings come from sptnr's stage spans.
+Nothing leaves the machine and the real cache in ./data is not touched.
+
+    python bench_providers.py --artists 10 --latency-ms 40 --throttle-rate 0.02
+    python bench_providers.py --runs 2 --no-rate-limits --json bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+
+from requests.adapters import HTTPAdapter
+
+PROVIDER_HOSTS = {
+    "accounts.spotify.com":  "spotify",
+    "api.spotify.com":       "spotify",
+    "ws.audioscrobbler.com": "lastfm",
+    "www.last.fm":           "lastfm_web",
+    "musicbrainz.org":       "musicbrainz",
+    "api.discogs.com":       "discogs",
+    "www.googleapis.com":    "youtube",
+    "navidrome.bench":       "navidrome",
+}
+
+parser = argparse.ArgumentParser(description="🏁 SPTNR offline benchmark against local stand-in providers")
+parser.add_argument("--artists", type=int, default=5, help="Synthetic artists to rate")
+parser.add_argument("--albums", type=int, default=3, help="Albums per artist")
+parser.add_argument("--tracks", type=int, default=10, help="Tracks per album")
+parser.add_argument("--latency-ms", type=float, default=25.0, help="Base response latency of the stand-in server")
+parser.add_argument("--jitter-ms", type=float, default=10.0, help="Random extra latency (0..jitter)")
+parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After seconds sent with injected 429s")
+parser.add_argument("--single-every", type=int, default=4, help="Every Nth track is a single at every provider")
+parser.add_argument("--spotify-coverage", type=float, default=0.9,
+                    help="Fraction of tracks present on the Spotify album (the rest use per-track search)")
+parser.add_argument("--lastfm-coverage", type=float, default=0.8,
+                    help="Fraction of tracks in Last.fm top tracks (the rest use track.getInfo)")
+parser.add_argument("--changed-fraction", type=float, default=0.05,
+                    help="Fraction of Navidrome ratings changed behind sptnr's back before each later run")
+parser.add_argument("--workers", type=int, default=1, help="Concurrent per-track lookups within an album")
+parser.add_argument("--artist-workers", type=int, default=1, help="Artists rated concurrently")
+parser.add_argument("--verbose", action="store_true", help="Show sptnr's own per-track output")
+parser.add_argument("--runs", type=int, default=1, help="Repeat the pass; later runs show warm-cache behaviour")
+parser.add_argument("--no-rate-limits", action="store_true",
+                    help="Lift per-provider request budgets to measure raw throughput")
+parser.add_argument("--no-http-cache", action="store_true", help="Disable sptnr's HTTP response cache")
+parser.add_argument("--seed", type=int, default=42, help="Seed for latency jitter and throttling")
+parser.add_argument("--json", type=str, help="Write results as JSON to this path")
+args = parser.parse_args()
+
+
+# ---- Synthetic discography --------------------------------------------------
+def artist_name(a):
+    return f"Bench Artist {a:04d}"
+
+def album_name(a, b):
+    return f"Bench Album {a:04d} {b:02d}"
+
+def track_title(a, b, c):
+    return f"Song {a:04d} {b:02d} {c:02d}"
+
+def is_single(c):
+    return args.single_every > 0 and c % args.single_every == 0
+
+def artist_number(text):
+    m = re.search(r"Bench Artist (\d+)", text or "")
+    return int(m.group(1)) if m else None
+
+def parse_title(text):
+    m = re.search(r"Song (\d+) (\d+) (\d+)", text or "")
+    return tuple(int(x) for x in m.groups()) if m else None
+
+def popularity(a, b, c):
+    return (a * 31 + b * 17 + c * 7) % 100
+
+def covered(fraction, *key):
+    """Deterministic membership test, stable across runs and processes."""
+    return zlib.crc32(repr(key).encode("utf-8")) % 1000 < fraction * 1000
+
+
+# ---- Stand-in provider server -----------------------------------------------
+class ServerStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.throttled = {}
+        self.rng = random.Random(args.seed)
+
+    def record(self, provider, throttled):
+        with self.lock:
+            self.requests[provider] = self.requests.get(provider, 0) + 1
+            if throttled:
+                self.throttled[provider] = self.throttled.get(provider, 0) + 1
+
+    def draw(self):
+        with self.lock:
+            return self.rng.random(), self.rng.random()
+
+    def reset(self):
+        with self.lock:
+            self.requests, self.throttled = {}, {}
+
+stats = ServerStats()
+nav_ratings = {}          # Navidrome's stored userRating per track, written by setRating
+nav_lock = threading.Lock()
+
+
+def spotify_track(a, b, c):
+    return {
+        "id": f"sp-{a}-{b}-{c}", "name": track_title(a, b, c), "popularity": popularity(a, b, c),
+        "album": {"name": album_name(a, b), "release_date": f"{1990 + b}-01-01",
+                  "album_type": "album",
+                  "total_tracks": args.tracks, "images": []},
+        "artists": [{"name": artist_name(a), "genres": ["rock"]}],
+    }
+
+def route(host, path, q, method):
+    """Return (status, payload) for one request to an emulated provider endpoint."""
+    get = lambda k, d="": q.get(k, [d])[0]
+
+    if host == "accounts.spotify.com":
+        return 200, {"access_token": "bench-token", "expires_in": 3600}
+
+    if host == "api.spotify.com":
+        if path == "/v1/search":
+            query = get("q")
+            a = artist_number(query)
+            if get("type") == "album":
+                m = re.search(r"Bench Album (\d+) (\d+)", query)
+                if a is None or not m:
+                    return 200, {"albums": {"items": []}}
+                b = int(m.group(2))
+                return 200, {"albums": {"items": [{"id": f"alb-{a}-{b}", "name": album_name(a, b)}]}}
+            t = parse_title(query)
+            return 200, {"tracks": {"items": [spotify_track(*t)] if t else []}}
+        m = re.match(r"/v1/albums/alb-(\d+)-(\d+)/tracks", path)
+        if m:
+            a, b = int(m.group(1)), int(m.group(2))
+            items = [{"id": f"sp-{a}-{b}-{c}"} for c in range(args.tracks)
+                     if covered(args.spotify_coverage, "sp", a, b, c)]
+            return 200, {"items": items, "next": None}
+        if path == "/v1/tracks":
+            out = []
+            for tid in get("ids").split(","):
+                m = re.match(r"sp-(\d+)-(\d+)-(\d+)", tid)
+                out.append(spotify_track(*map(int, m.groups())) if m else None)
+            return 200, {"tracks": out}
+        return 404, {}
+
+    if host == "ws.audioscrobbler.com":
+        method_name, a = get("method"), artist_number(get("artist"))
+        if a is None:
+            return 200, {}
+        if method_name == "artist.getInfo":
+            return 200, {"artist": {"stats": {"playcount": str(1_000_000 + a)}}}
+        if method_name == "artist.getTopTracks":
+            tracks = [{"name": track_title(a, b, c), "playcount": str(1000 + popularity(a, b, c) * 50)}
+                      for b in range(args.albums) for c in range(args.tracks)
+                      if covered(args.lastfm_coverage, "lf", a, b, c)]
+            return 200, {"toptracks": {"track": tracks, "@attr": {"totalPages": "1"}}}
+        if method_name == "track.getInfo":
+            t = parse_title(get("track"))
+            if not t:
+                return 200, {}
+            return 200, {"track": {"playcount": str(1000 + popularity(*t) * 50),
+                                   "artist": {"stats": {"playcount": str(1_000_000 + a)}}}}
+        return 200, {}
+
+    if host == "musicbrainz.org":
+        if path.startswith("/ws/2/artist"):
+            a = artist_number(get("query"))
+            artists = [{"id": f"mb-{a}", "name": artist_name(a), "score": 100}] if a is not None else []
+            return 200, {"artists": artists}
+        if path.startswith("/ws/2/release-group"):
+            if get("artist"):
+                a = int(get("artist").split("-")[1])
+                groups = [{"title": album_name(a, b), "primary-type": "Album"} for b in range(args.albums)]
+                groups += [{"title": track_title(a, b, c), "primary-type": "Single"}
+                           for b in range(args.albums) for c in range(args.tracks) if is_single(c)]
+                offset, limit = int(get("offset", "0")), int(get("limit", "100"))
+                return 200, {"release-groups": groups[offset:offset + limit],
+                             "release-group-count": len(groups)}
+            t = parse_title(get("query"))
+            hit = t and is_single(t[2])
+            return 200, {"release-groups": [{"title": track_title(*t), "primary-type": "Single"}] if hit else []}
+        return 404, {}
+
+    if host == "api.discogs.com":
+        if get("artist"):
+            a = artist_number(get("artist"))
+            if a is None:
+                return 200, {"results": [], "pagination": {"pages": 1}}
+            results = [{"title": f"{artist_name(a)} - {album_name(a, b)}", "format": ["CD", "Album"],
+                        "genre": ["Rock"], "style": ["Alternative Rock"]} for b in range(args.albums)]
+            results += [{"title": f"{artist_name(a)} - {track_title(a, b, c)}", "format": ["Vinyl", "7\"", "Single"],
+                         "genre": ["Rock"], "style": []}
+                        for b in range(args.albums) for c in range(args.tracks) if is_single(c)]
+            per_page, page = int(get("per_page", "100")), int(get("page", "1"))
+            pages = max(1, -(-len(results) // per_page))
+            return 200, {"results": results[(page - 1) * per_page:page * per_page],
+                         "pagination": {"pages": pages}}
+        t = parse_title(get("q"))
+        hit = t and is_single(t[2])
+        return 200, {"results": [{"title": f"{artist_name(t[0])} - {track_title(*t)}",
+                                  "format": ["Vinyl", "Single"]}] if hit else []}
+
+    if host == "www.googleapis.com":
+        if path == "/youtube/v3/search":
+            a, t = artist_number(get("q")), parse_title(get("q"))
+            if a is None or not t:
+                return 200, {"items": []}
+            if is_single(t[2]):
+                item = {"snippet": {"title": f"{artist_name(a)} - {track_title(*t)} (Official Video)",
+                                    "channelId": f"UC-bench-{a}"}}
+            else:
+                item = {"snippet": {"title": f"{track_title(*t)} live at a fan gig",
+                                    "channelId": f"UC-fan-{a}"}}
+            return 200, {"items": [item]}
+        if path == "/youtube/v3/channels":
+            items = []
+            for cid in get("id").split(","):
+                m = re.match(r"UC-(bench|fan)-(\d+)", cid)
+                if m:
+                    title = f"{artist_name(int(m.group(2)))} Official" if m.group(1) == "bench" else "Gig Uploads"
+                    items.append({"id": cid, "snippet": {"title": title, "description": ""}})
+            return 200, {"items": items}
+        return 404, {}
+
+    if host == "navidrome.bench":
+        response = {"status": "ok", "version": "1.16.1"}
+        if path.endswith("/getArtist.view"):
+            a = int(get("id").split("-")[1])
+            response["artist"] = {"id": get("id"), "name": artist_name(a),
+                                  "album": [{"id": f"alb-nav-{a}-{b}", "name": album_name(a, b),
+                                             "songCount": args.tracks} for b in range(args.albums)]}
+        elif path.endswith("/getAlbum.view"):
+            a, b = map(int, get("id").split("-")[2:4])
+            with nav_lock:
+                songs = [{"id": f"nav-{a}-{b}-{c}", "title": track_title(a, b, c), "album": album_name(a, b),
+                          "artist": artist_name(a), "genre": "Rock",
+                          **({"userRating": nav_ratings[f"nav-{a}-{b}-{c}"]}
+                             if f"nav-{a}-{b}-{c}" in nav_ratings else {})}
+                         for c in range(args.tracks)]
+            response["album"] = {"id": get("id"), "name": album_name(a, b), "song": songs}
+        elif path.endswith("/setRating.view"):
+            with nav_lock:
+                nav_ratings[get("id")] = int(get("rating", "0"))
+        return 200, {"subsonic-response": response}
+
+    return 404, {}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        host = self.headers.get("X-Bench-Host", "")
+        provider = PROVIDER_HOSTS.get(host, host)
+        parts = urlsplit(self.path)
+
+        throttle_draw, jitter_draw = stats.draw()
+        time.sleep((args.latency_ms + jitter_draw * args.jitter_ms) / 1000.0)
+        throttled = throttle_draw < args.throttle_rate and provider != "navidrome"
+        stats.record(provider, throttled)
+
+        if throttled:
+            status, payload, headers = 429, {}, {"Retry-After": str(args.retry_after)}
+        else:
+            status, payload = route(host, parts.path, parse_qs(parts.query), self.command)
+            headers = {}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _serve
+    do_POST = _serve
+
+    def log_message(self, *a):
+        pass
+
+
+class LocalRedirectAdapter(HTTPAdapter):
+    """Sends every request to the stand-in server, keeping the original host in a header."""
+    def __init__(self, port, **kwargs):
+        self.port = port
+        super().__init__(pool_maxsize=32, **kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.headers["X-Bench-Host"] = parts.netloc
+        request.url = urlunsplit(("http", f"127.0.0.1:{self.port}", parts.path, parts.query, ""))
+        return super().send(request, **kwargs)
+
+
+# ---- Environment: temp data dir + fake credentials, before sptnr is imported --
+server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+server.daemon_threads = True
+threading.Thread(target=server.serve_forever, daemon=True).start()
+port = server.server_address[1]
+
+invocation_dir = os.getcwd()
+workdir = tempfile.mkdtemp(prefix="sptnr-bench-")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(workdir)
+os.environ.update({
+    "SPOTIFY_CLIENT_ID": "bench", "SPOTIFY_CLIENT_SECRET": "bench",
+    "LASTFMAPIKEY": "bench", "YOUTUBE_API_KEY": "bench",
+    "NAV_BASE_URL": "https://navidrome.bench", "NAV_USER": "bench", "NAV_PASS": "bench",
+})
+if args.no_rate_limits:
+    for host_provider in set(PROVIDER_HOSTS.values()):
+        os.environ[f"RATE_LIMIT_{host_provider.upper()}"] = "10000:10000"
+if args.no_http_cache:
+    os.environ["HTTP_CACHE"] = "0"
+
+import sptnr
+
+adapter = LocalRedirectAdapter(port)
+for provider in sptnr.PROVIDER_DEFAULTS:
+    session = sptnr.get_http_session(provider)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+# ---- Helpers sptnr.py calls but does not define yet ---------------------------
+# Only names missing from sptnr are filled in, so real implementations take over as they land.
+def fetch_artist_albums(artist_id):
+    nav_base, auth = sptnr.get_auth_params()
+    res = sptnr.http_get("navidrome", f"{nav_base}/rest/getArtist.view", params={**auth, "id": artist_id})
+    return res.json()["subsonic-response"].get("artist", {}).get("album", [])
+
+def fetch_album_tracks(album_id):
+    nav_base, auth = sptnr.get_auth_params()
+    res = sptnr.http_get("navidrome", f"{nav_base}/rest/getAlbum.view", params={**auth, "id": album_id})
+    return res.json()["subsonic-response"].get("album", {}).get("song", [])
+
+def compute_track_score(title, artist, release_date, sp_score, mbid=None, verbose=False):
+    return float(sp_score), 0.0, 0.0     # (score, age momentum, ListenBrainz score)
+
+def get_top_genres_with_navidrome(sources, nav_genres, title=None, album=None):
+    merged = [g for genres in sources.values() for g in genres or []] + list(nav_genres)
+    return list(dict.fromkeys(merged))[:3], {}
+
+MISSING_HELPERS = {
+    "fetch_artist_albums": fetch_artist_albums,
+    "fetch_album_tracks": fetch_album_tracks,
+    "compute_track_score": compute_track_score,
+    "get_top_genres_with_navidrome": get_top_genres_with_navidrome,
+    "get_discogs_genres": lambda title, artist: [],
+    "get_audiodb_genres": lambda artist: [],
+    "get_musicbrainz_genres": lambda title, artist: [],
+    "adjust_genres": lambda genres, artist_is_metal=False: genres,
+    "is_valid_version": lambda title, allow_live_remix=True: allow_live_remix or
+                        not re.search(r"\b(live|remix)\b", title, re.I),
+    "create_playlist": lambda name, track_ids: None,
+    "DISCOGS_TOKEN": "bench",
+    "YOUTUBE_API_KEY": os.environ["YOUTUBE_API_KEY"],
+    "AUDIODB_API_KEY": "",
+    "sync": False,           # rate_artist's Essential-playlist gate
+    "dry_run": True,
+}
+for helper, value in MISSING_HELPERS.items():
+    if not hasattr(sptnr, helper):
+        setattr(sptnr, helper, value)
+
+artist_map = {artist_name(a): f"nav-{a}" for a in range(args.artists)}
+sptnr.save_artist_index(artist_map)
+
+
+# ---- One benchmark pass: sptnr.batch_rate → rate_artist → sync ---------------
+def run_pass(number):
+    stats.reset()
+    with sptnr._single_stats_lock:
+        for st in sptnr.single_source_stats.values():
+            st.update(calls=0, hits=0, seconds=0.0)
+    if number > 1:
+        with nav_lock:
+            for tid in nav_ratings:
+                if covered(args.changed_fraction, "nav", tid, number):
+                    nav_ratings[tid] = nav_ratings[tid] % 5 + 1
+
+    metrics_start = sptnr.metrics_snapshot()
+    with sptnr._stage_lock:
+        stages_before = dict(sptnr.stage_totals)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with quiet:
+        failed = sptnr.batch_rate(sync=True, workers=args.workers, artist_workers=args.artist_workers)
+    wall = time.perf_counter() - start
+    with sptnr._stage_lock:
+        stage_seconds = {s: t - stages_before.get(s, 0.0) for s, t in sptnr.stage_totals.items()}
+
+    tracks = (len(artist_map) - len(failed)) * args.albums * args.tracks
+    with stats.lock:
+        requests_by_provider = dict(stats.requests)
+        throttled_by_provider = dict(stats.throttled)
+    return {
+        "run": number,
+        "tracks": tracks,
+        "failed_artists": failed,
+        "wall_seconds": round(wall, 3),
+        "tracks_per_second": round(tracks / wall, 2) if wall else None,
+        "stage_seconds": {s: round(stage_seconds.get(s, 0.0), 3) for s in sptnr.RATE_STAGES},
+        "requests": requests_by_provider,
+        "requests_per_track": {p: round(n / tracks, 3) for p, n in requests_by_provider.items()} if tracks else {},
+        "throttled": throttled_by_provider,
+        "single_sources": sptnr.get_single_source_stats(),
+        "rate_limiters": sptnr.get_rate_limiter_state(),
+        "metrics": sptnr.get_metrics(since=metrics_start),
+    }
+
+
+def print_run(result):
+    print(f"\n🏁 Run {result['run']}: {result['tracks']} tracks in {result['wall_seconds']:.2f}s "
+          f"({result['tracks_per_second']} tracks/s)")
+    if result["failed_artists"]:
+        print(f"   ⚠️ Failed artists: {', '.join(result['failed_artists'])}")
+    print("   ⏱️ Stage time (sptnr stage spans, thread-seconds; overlapping stages can exceed wall time):")
+    for s, secs in result["stage_seconds"].items():
+        if not secs:
+            continue
+        share = secs / result["wall_seconds"] * 100 if result["wall_seconds"] else 0
+        print(f"      {s:<14} {secs:>8.3f}s  {share:5.1f}%")
+    print("   📡 Requests per track:")
+    for p in sorted(result["requests"]):
+        print(f"      {p:<14} {result['requests_per_track'][p]:>8.3f}  "
+              f"({result['requests'][p]} total, {result['throttled'].get(p, 0)} throttled)")
+
+
+if __name__ == "__main__":
+    print(f"🧪 Stand-in providers on 127.0.0.1:{port}, data in {workdir}")
+    print(f"   {args.artists} artists × {args.albums} albums × {args.tracks} tracks, "
+          f"latency {args.latency_ms:.0f}+{args.jitter_ms:.0f}ms, 429 rate {args.throttle_rate:.0%}, "
+          f"workers {args.workers}, artist workers {args.artist_workers}")
+
+    results = []
+    for n in range(1, max(1, args.runs) + 1):
+        result = run_pass(n)
+        print_run(result)
+        results.append(result)
+
+    if args.json:
+        report = {"config": vars(args), "results": results}
+        with open(os.path.join(invocation_dir, args.json), "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+    server.shutdown()
@@ -0,0 +1,238 @@
+"""
+📈 SPTNR scaling benchmark for the local (non-network) paths
+
+Generates synthetic libraries of increasing size and measures wall time, CPU
+time and peak Python heap of the rating cache, resume lookups, artist index
+filtering, star banding and the rating summary. Results are appended as JSON
+lines tagged with the sptnr version, so runs from different versions can be
+compared; a scaling exponent per case (1.0 = linear, 2.0 = quadratic) is
+printed at the end.
+
+    python bench_scaling.py
+    python bench_scaling.py --sizes 1000:100,20000:2000 --repeat 5 --output scaling.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="📈 SPTNR scaling benchmark (caches, scoring, index lookups)")
+parser.add_argument("--sizes", type=str, default="1000:100,10000:1000,100000:10000,500000:50000",
+                    help="Comma-separated tracks:artists library sizes")
+parser.add_argument("--tracks-per-album", type=int, default=10, help="Album size of the synthetic library")
+parser.add_argument("--repeat", type=int, default=3, help="Repetitions per case (fastest is reported)")
+parser.add_argument("--cases", type=str, help="Only run these comma-separated cases")
+parser.add_argument("--output", type=str, default="bench_scaling.jsonl", help="JSON-lines file results are appended to")
+parser.add_argument("--seed", type=int, default=7, help="Seed for the synthetic library")
+args = parser.parse_args()
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+invocation_dir = os.getcwd()
+workdir = tempfile.mkdtemp(prefix="sptnr-scaling-")
+sys.path.insert(0, ROOT)
+os.chdir(workdir)
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench")
+
+import sptnr
+
+try:
+    with open(os.path.join(ROOT, "VERSION")) as f:
+        VERSION = f.read().strip()
+except OSError:
+    VERSION = "unknown"
+
+
+# ---- Synthetic library --------------------------------------------------------
+def build_library(n_tracks, n_artists):
+    rng = random.Random(args.seed)
+    start = datetime(2024, 1, 1)
+    artists = {f"Synthetic Artist {a:05d}": f"ar-{a}" for a in range(n_artists)}
+    names = list(artists)
+    tracks = []
+    for i in range(n_tracks):
+        artist = names[i * n_artists // n_tracks]          # contiguous runs, like a real scan
+        album_no = i // args.tracks_per_album
+        tracks.append({
+            "id": f"tr-{i}",
+            "title": f"Track {i}",
+            "artist": artist,
+            "album_id": f"al-{album_no}",
+            "score": rng.uniform(-5, 120),
+            "stars": rng.randint(1, 5),
+            "is_single": rng.random() < 0.08,
+            "sources": ["musicbrainz", "discogs"] if rng.random() < 0.08 else [],
+            "last_scanned": (start + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+    return artists, tracks
+
+def reset_store():
+    conn = sptnr.get_cache_db()
+    with conn:
+        conn.execute("DELETE FROM ratings")
+        conn.execute("DELETE FROM artist_index")
+    conn.execute("VACUUM")
+
+def write_journal(tracks):
+    """A run interrupted halfway: every album of the first half recorded as done."""
+    half = tracks[:len(tracks) // 2]
+    with open(sptnr.RUN_JOURNAL_FILE, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"event": "run_start", "run": "bench"}) + "\n")
+        current_artist, current_album = None, None
+        for t in half:
+            if t["artist"] != current_artist:
+                if current_artist:
+                    f.write(json.dumps({"event": "artist_done", "run": "bench", "artist": current_artist}) + "\n")
+                current_artist = t["artist"]
+                f.write(json.dumps({"event": "artist_start", "run": "bench", "artist": current_artist}) + "\n")
+            if t["album_id"] != current_album:
+                current_album = t["album_id"]
+                f.write(json.dumps({"event": "album_done", "run": "bench", "artist": current_artist,
+                                    "album_id": current_album, "tracks": args.tracks_per_album}) + "\n")
+
+
+# ---- Cases: name -> (setup(library) -> state, run(state)) --------------------
+def case_cache_save(lib):
+    entries = {t["id"]: {"stars": t["stars"], "score": t["score"], "artist": t["artist"],
+                         "last_scanned": t["last_scanned"]} for t in lib["tracks"]}
+    def run():
+        sptnr.save_rating_cache(entries)
+    return run
+
+def case_cache_load(lib):
+    return lambda: sptnr.load_rating_cache()
+
+def case_cache_load_artist(lib):
+    # what rate_artist/sync read: one artist's tracks
+    first = lib["tracks"][0]["artist"]
+    ids = [t["id"] for t in lib["tracks"] if t["artist"] == first]
+    return lambda: sptnr.load_rating_cache(ids)
+
+def case_resume_from_cache(lib):
+    return lambda: sptnr.get_resume_artist_from_cache()
+
+def case_resume_from_journal(lib):
+    return lambda: sptnr.get_resume_point()
+
+def case_pipe_output(lib):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                sptnr.pipe_output("artist 00")
+            except SystemExit:
+                pass
+    return run
+
+def case_band_per_album(lib):
+    albums = {}
+    for t in lib["tracks"]:
+        albums.setdefault(t["album_id"], []).append(t)
+    def run():
+        for album_tracks in albums.values():
+            ordered = sorted(album_tracks, key=lambda x: x["score"], reverse=True)
+            sptnr.band_scores([t["score"] for t in ordered], [t["is_single"] for t in ordered])
+    return run
+
+def case_band_library(lib):
+    scores  = [t["score"] for t in lib["tracks"]]
+    singles = [t["is_single"] for t in lib["tracks"]]
+    albums  = [t["album_id"] for t in lib["tracks"]]
+    return lambda: sptnr.band_scores(scores, singles, album_ids=albums)
+
+def case_rating_summary(lib):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            sptnr.print_rating_summary(lib["tracks"], 0)
+    return run
+
+CASES = {
+    "cache_save":          case_cache_save,
+    "cache_load":          case_cache_load,
+    "cache_load_artist":   case_cache_load_artist,
+    "resume_from_cache":   case_resume_from_cache,
+    "resume_from_journal": case_resume_from_journal,
+    "pipe_output":         case_pipe_output,
+    "band_per_album":      case_band_per_album,
+    "band_library":        case_band_library,
+    "rating_summary":      case_rating_summary,
+}
+
+
+def measure(run):
+    """Fastest of args.repeat runs: (wall s, cpu s); peak Python heap from one traced run."""
+    best_wall, best_cpu = None, None
+    for _ in range(max(1, args.repeat)):
+        w0, c0 = time.perf_counter(), time.process_time()
+        run()
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        if best_wall is None or wall < best_wall:
+            best_wall, best_cpu = wall, cpu
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_wall, best_cpu, peak
+
+
+def parse_sizes(spec):
+    sizes = []
+    for part in spec.split(","):
+        tracks, _, artists = part.partition(":")
+        sizes.append((int(tracks), int(artists or max(1, int(tracks) // 10))))
+    return sizes
+
+
+if __name__ == "__main__":
+    wanted = [c.strip() for c in args.cases.split(",")] if args.cases else list(CASES)
+    unknown = [c for c in wanted if c not in CASES]
+    if unknown:
+        print(f"❌ Unknown case(s): {', '.join(unknown)} — choose from {', '.join(CASES)}")
+        sys.exit(1)
+
+    out_path = os.path.join(invocation_dir, args.output)
+    stamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    print(f"📈 sptnr {VERSION} scaling benchmark (numpy: {'yes' if sptnr.have_numpy() else 'no'}), data in {workdir}")
+
+    results = {}
+    for n_tracks, n_artists in parse_sizes(args.sizes):
+        print(f"\n🧱 Library: {n_tracks} tracks, {n_artists} artists")
+        artists, tracks = build_library(n_tracks, n_artists)
+        reset_store()
+        sptnr.save_artist_index(artists)
+        sptnr.save_rating_cache({t["id"]: {"stars": t["stars"], "score": t["score"], "artist": t["artist"],
+                                           "last_scanned": t["last_scanned"]} for t in tracks})
+        write_journal(tracks)
+        lib = {"artists": artists, "tracks": tracks}
+
+        for name in wanted:
+            wall, cpu, peak = measure(CASES[name](lib))
+            record = {
+                "timestamp": stamp, "version": VERSION, "numpy": sptnr.have_numpy(),
+                "case": name, "tracks": n_tracks, "artists": n_artists,
+                "wall_s": round(wall, 6), "cpu_s": round(cpu, 6), "peak_kb": round(peak / 1024, 1),
+                "us_per_track": round(wall / n_tracks * 1e6, 3),
+            }
+            results.setdefault(name, []).append(record)
+            with open(out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            print(f"   {name:<20} {wall * 1000:>10.2f} ms  cpu {cpu * 1000:>10.2f} ms  "
+                  f"peak {peak / 1024:>10.1f} KiB  {record['us_per_track']:>8.3f} µs/track")
+
+    print("\n📐 Scaling exponent (time growth vs. library growth; 1.0 = linear, 2.0 = quadratic):")
+    for name, records in results.items():
+        exps = []
+        for prev, cur in zip(records, records[1:]):
+            if prev["wall_s"] > 0 and cur["wall_s"] > 0 and cur["tracks"] != prev["tracks"]:
+                exps.append(math.log(cur["wall_s"] / prev["wall_s"]) / math.log(cur["tracks"] / prev["tracks"]))
+        shown = "  ".join(f"{e:5.2f}" for e in exps) or "-"
+        flag = "  ⚠️ superlinear" if exps and exps[-1] > 1.3 else ""
+        print(f"   {name:<20} {shown}{flag}")
+    print(f"\n💾 Results appended to {out_path}")
@@ -1,61 +1,1041 @@
 # 🎧 SPTNR – Navidrome Rating CLI with Spotify + Last.fm integration
-import argparse, os, sys, requests, time, random, json, logging, base64, re
-from dotenv import load_dotenv
-from colorama import init, Fore, Style
+import argparse, os, sys, time, random, json, logging, base64, re, hashlib
+import sqlite3, threading, socket
 
 # --- core stdlib imports used throughout ---
 from datetime import datetime, timedelta
 from statistics import median, mean
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import math
 
 
-# 🎨 Colorama setup
-init(autoreset=True)
-LIGHT_RED = Fore.RED + Style.BRIGHT
-LIGHT_GREEN = Fore.GREEN + Style.BRIGHT
-LIGHT_BLUE = Fore.BLUE + Style.BRIGHT
-LIGHT_YELLOW = Fore.YELLOW + Style.BRIGHT
-LIGHT_CYAN = Fore.CYAN + Style.BRIGHT
-BOLD = Style.BRIGHT
-RESET = Style.RESET_ALL
+# 🎨 ANSI colours (same codes as colorama's Fore/Style; init_console() sets colorama up for the CLI)
+LIGHT_RED = "\033[31m\033[1m"
+LIGHT_GREEN = "\033[32m\033[1m"
+LIGHT_BLUE = "\033[34m\033[1m"
+LIGHT_YELLOW = "\033[33m\033[1m"
+LIGHT_CYAN = "\033[36m\033[1m"
+BOLD = "\033[1m"
+RESET = "\033[0m"
+
+def init_console():
+    """Colorama setup for commands that print coloured progress (translates ANSI on Windows)."""
+    from colorama import init
+    init(autoreset=True)
 
 # 🔐 Load environment variables
-load_dotenv()
+def load_env_file():
+    """
+    Load .env like python-dotenv's load_dotenv() (searched upwards from this file), but
+    only import dotenv when a file exists — containers pass env vars and skip it entirely.
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(folder, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return path
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return None
+        folder = parent
+
+load_env_file()
 client_id = os.getenv("SPOTIFY_CLIENT_ID")
 client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
 
-if not client_id or not client_secret:
-    logging.error(f"{LIGHT_RED}Missing Spotify credentials.{RESET}")
-    sys.exit(1)
+def require_spotify_credentials():
+    """Exit when the Spotify client credentials are missing; checked by commands that rate tracks."""
+    if not client_id or not client_secret:
+        logging.error(f"{LIGHT_RED}Missing Spotify credentials.{RESET}")
+        sys.exit(1)
 
 # ⚙️ Global constants
 try:
     SPOTIFY_WEIGHT = float(os.getenv("SPOTIFY_WEIGHT", "0.5"))
     LASTFM_WEIGHT = float(os.getenv("LASTFM_WEIGHT", "0.5"))
+    LISTENBRAINZ_WEIGHT = float(os.getenv("LISTENBRAINZ_WEIGHT", "0.2"))
+    AGE_WEIGHT = float(os.getenv("AGE_WEIGHT", "0.1"))
 except ValueError:
     print("⚠️ Invalid weight in .env — using defaults.")
     SPOTIFY_WEIGHT = 0.5
     LASTFM_WEIGHT = 0.5
+    LISTENBRAINZ_WEIGHT = 0.2
+    AGE_WEIGHT = 0.1
+
+# 🧾 Feature config (clamp_min/clamp_max, cap_top4_pct, known_singles, use_audiodb), read on first use
+CONFIG_FILE = os.getenv("SPTNR_CONFIG", os.path.join("config", "config.yaml"))
+_config = None
+
+def get_config():
+    """config/config.yaml as a dict with at least a "features" mapping; defaults when absent."""
+    global _config
+    if _config is None:
+        data = {}
+        if os.path.isfile(CONFIG_FILE):
+            import yaml
+            try:
+                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                    data = yaml.safe_load(f) or {}
+            except (OSError, yaml.YAMLError) as e:
+                print(f"⚠️ Could not read {CONFIG_FILE}: {e} — using defaults.")
+        if not isinstance(data.get("features"), dict):
+            data["features"] = {}
+        _config = data
+    return _config
 
-SLEEP_TIME = 1.5
+SLEEP_TIME = float(os.getenv("SLEEP_TIME", "0"))  # per-provider rate limiters pace requests now
 
 # 📁 Cache paths (aligned with mounted volume)
 
 DATA_DIR = "data"  # Or "Data", if your host mount uses capital D
-os.makedirs(DATA_DIR, exist_ok=True)
 INDEX_FILE = os.path.join(DATA_DIR, "artist_index.json")
 RATING_CACHE_FILE = os.path.join(DATA_DIR, "rating_cache.json")
 SINGLE_CACHE_FILE = os.path.join(DATA_DIR, "single_cache.json")
 CHANNEL_CACHE_FILE = os.path.join(DATA_DIR, "channel_cache.json")
 
-#confirm files exist
-for path in [RATING_CACHE_FILE, SINGLE_CACHE_FILE, CHANNEL_CACHE_FILE, INDEX_FILE]:
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("{}")  # safe empty JSON object
+# 🗄️ SQLite cache store (replaces the whole-file JSON caches above; those are migrated once)
+CACHE_DB_FILE = os.path.join(DATA_DIR, "sptnr_cache.db")
+CACHE_BATCH_SIZE = 500
+
+_cache_db_local = threading.local()
+_cache_db_lock = threading.Lock()
+_cache_db_ready = False
+_http_cache_pruned = False
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratings (
+    track_id     TEXT PRIMARY KEY,
+    artist       TEXT,
+    stars        INTEGER,
+    score        REAL,
+    last_scanned TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ratings_artist ON ratings(artist);
+CREATE INDEX IF NOT EXISTS idx_ratings_last_scanned ON ratings(last_scanned);
+
+CREATE TABLE IF NOT EXISTS singles (
+    key          TEXT PRIMARY KEY,
+    artist       TEXT,
+    title        TEXT,
+    is_single    INTEGER,
+    confidence   TEXT,
+    sources      TEXT,
+    skipped      TEXT,
+    last_scanned TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_singles_artist_title ON singles(artist, title);
+CREATE INDEX IF NOT EXISTS idx_singles_last_scanned ON singles(last_scanned);
+
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id   TEXT PRIMARY KEY,
+    verdict      INTEGER,
+    title        TEXT,
+    last_checked TEXT
+);
+
+CREATE TABLE IF NOT EXISTS artist_index (
+    name      TEXT PRIMARY KEY,
+    artist_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_artist_index_id ON artist_index(artist_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS http_cache (
+    key           TEXT PRIMARY KEY,
+    provider      TEXT,
+    status        INTEGER,
+    content_type  TEXT,
+    body          BLOB,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL,
+    expires_at    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_expires ON http_cache(expires_at);
+
+CREATE TABLE IF NOT EXISTS album_state (
+    album_id      TEXT PRIMARY KEY,
+    artist        TEXT,
+    fingerprint   TEXT,
+    track_count   INTEGER,
+    changed       TEXT,
+    last_enriched TEXT,
+    last_rescored TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_album_state_artist ON album_state(artist);
+CREATE INDEX IF NOT EXISTS idx_album_state_last_enriched ON album_state(last_enriched);
+
+CREATE TABLE IF NOT EXISTS provider_index (
+    provider   TEXT,
+    artist     TEXT,
+    data       TEXT,
+    fetched_at TEXT,
+    PRIMARY KEY (provider, artist)
+);
+
+CREATE TABLE IF NOT EXISTS track_signals (
+    track_id                TEXT PRIMARY KEY,
+    artist                  TEXT,
+    album_id                TEXT,
+    album                   TEXT,
+    position                INTEGER,
+    title                   TEXT,
+    spotify_score           REAL,
+    spotify_popularity      REAL,
+    lastfm_track_playcount  INTEGER,
+    lastfm_artist_playcount INTEGER,
+    lastfm_ratio            REAL,
+    listenbrainz_score      REAL,
+    age_score               REAL,
+    is_single               INTEGER,
+    single_confidence       TEXT,
+    single_sources          TEXT,
+    score                   REAL,
+    stars                   INTEGER,
+    last_scanned            TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_track_signals_artist ON track_signals(artist);
+CREATE INDEX IF NOT EXISTS idx_track_signals_album ON track_signals(album_id, position);
+"""
+
+def get_cache_db():
+    """Per-thread SQLite connection to the cache store (WAL mode, created on first use)."""
+    global _cache_db_ready
+    conn = getattr(_cache_db_local, "conn", None)
+    if conn is not None:
+        return conn
+    ensure_parent_dir(CACHE_DB_FILE)
+    conn = sqlite3.connect(CACHE_DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _cache_db_local.conn = conn
+    if not _cache_db_ready:
+        with _cache_db_lock:
+            if not _cache_db_ready:
+                conn.executescript(CACHE_SCHEMA)
+                migrate_cache_schema(conn)
+                migrate_json_caches(conn)
+                _cache_db_ready = True
+    return conn
+
+def ensure_parent_dir(path):
+    """Create the folder a data file lives in; called by writers instead of at import."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+def _executemany_batched(sql, rows):
+    conn = get_cache_db()
+    rows = list(rows)
+    for i in range(0, len(rows), CACHE_BATCH_SIZE):
+        with conn:
+            conn.executemany(sql, rows[i:i + CACHE_BATCH_SIZE])
+
+def _read_json_file(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"⚠️ Could not read {path} for migration: {type(e).__name__} - {e}")
+        return {}
+
+# Columns added after a table first shipped; CREATE TABLE IF NOT EXISTS leaves existing tables alone
+CACHE_SCHEMA_COLUMNS = {
+    "album_state": (("last_rescored", "TEXT"),),
+}
+
+def migrate_cache_schema(conn):
+    for table, columns in CACHE_SCHEMA_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column, kind in columns:
+            if column not in existing:
+                with conn:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+def migrate_json_caches(conn):
+    """One-time import of the legacy JSON cache files; each file is renamed to *.migrated afterwards."""
+    legacy = [
+        ("rating_cache", RATING_CACHE_FILE),
+        ("single_cache", SINGLE_CACHE_FILE),
+        ("channel_cache", CHANNEL_CACHE_FILE),
+        ("artist_index", INDEX_FILE),
+    ]
+    for name, path in legacy:
+        if not os.path.exists(path):
+            continue
+        done = conn.execute("SELECT value FROM meta WHERE key = ?", (f"migrated:{name}",)).fetchone()
+        if done:
+            continue
+        data = _read_json_file(path)
+        with conn:
+            if name == "rating_cache":
+                conn.executemany(RATING_UPSERT_SQL, [_rating_row(tid, e) for tid, e in data.items() if isinstance(e, dict)])
+            elif name == "single_cache":
+                conn.executemany(SINGLE_UPSERT_SQL, [_single_row(k, e) for k, e in data.items() if isinstance(e, dict)])
+            elif name == "channel_cache":
+                conn.executemany(CHANNEL_UPSERT_SQL, [_channel_row(cid, v) for cid, v in data.items()])
+            else:
+                conn.executemany(ARTIST_UPSERT_SQL, [(n, str(aid)) for n, aid in data.items()])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         (f"migrated:{name}", datetime.now().strftime("%Y-%m-%dT%H:%M:%S")))
+        try:
+            os.replace(path, path + ".migrated")
+        except OSError:
+            pass
+        if data:
+            print(f"📦 Migrated {len(data)} entries from {os.path.basename(path)} into {os.path.basename(CACHE_DB_FILE)}")
+
+RATING_UPSERT_SQL = """
+INSERT INTO ratings (track_id, artist, stars, score, last_scanned) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(track_id) DO UPDATE SET
+    artist = COALESCE(excluded.artist, ratings.artist),
+    stars = excluded.stars, score = excluded.score, last_scanned = excluded.last_scanned
+"""
+SINGLE_UPSERT_SQL = """
+INSERT OR REPLACE INTO singles (key, artist, title, is_single, confidence, sources, skipped, last_scanned)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+CHANNEL_UPSERT_SQL = "INSERT OR REPLACE INTO channels (channel_id, verdict, title, last_checked) VALUES (?, ?, ?, ?)"
+ARTIST_UPSERT_SQL = "INSERT OR REPLACE INTO artist_index (name, artist_id) VALUES (?, ?)"
+SIGNAL_COLUMNS = (
+    "track_id", "artist", "album_id", "album", "position", "title",
+    "spotify_score", "spotify_popularity", "lastfm_track_playcount", "lastfm_artist_playcount",
+    "lastfm_ratio", "listenbrainz_score", "age_score",
+    "is_single", "single_confidence", "single_sources", "score", "stars", "last_scanned",
+)
+SIGNAL_UPSERT_SQL = (f"INSERT OR REPLACE INTO track_signals ({', '.join(SIGNAL_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' * len(SIGNAL_COLUMNS))})")
+
+def _rating_row(track_id, entry):
+    return (track_id, entry.get("artist"), entry.get("stars"), entry.get("score"), entry.get("last_scanned"))
+
+def _single_row(key, entry):
+    artist, _, title = key.partition("::")
+    return (key, artist, title, int(bool(entry.get("is_single"))), entry.get("confidence"),
+            json.dumps(entry.get("sources", [])), json.dumps(entry.get("skipped", [])),
+            entry.get("last_scanned"))
+
+def _channel_row(channel_id, entry):
+    # Legacy JSON cache stored a bare bool per channel
+    if not isinstance(entry, dict):
+        entry = {"official": bool(entry), "title": None}
+    return (channel_id, int(bool(entry.get("official"))), entry.get("title"),
+            entry.get("last_checked") or datetime.now().strftime("%Y-%m-%dT%H:%M:%S"))
 
 youtube_api_unavailable = False
 
+# 🌐 Shared HTTP client — one pooled keep-alive session per provider (requests is imported on first use)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+PROVIDER_DEFAULTS = {
+    "spotify":     {"timeout": 10, "headers": {}},
+    "lastfm":      {"timeout": 10, "headers": {"User-Agent": "sptnr-cli"}},
+    "lastfm_web":  {"timeout": 6,  "headers": {"User-Agent": "sptnr-cli"}},
+    "musicbrainz": {"timeout": 8,  "headers": {"User-Agent": "sptnr-cli/1.0 (support@example.com)"}},
+    "discogs":     {"timeout": 8,  "headers": {"User-Agent": "sptnr-cli/1.0"}},
+    "youtube":     {"timeout": 8,  "headers": {}},
+    "audiodb":     {"timeout": 8,  "headers": {}},
+    "listenbrainz":{"timeout": 8,  "headers": {}},
+    "navidrome":   {"timeout": 15, "headers": {}},
+}
+
+# Providers that answer over-limit requests with 503 + Retry-After instead of 429: those 503s go
+# to the rate limiter, so urllib3 must not retry them behind its back
+THROTTLE_503_PROVIDERS = {"musicbrainz"}
+
+_http_sessions = {}
+_http_lock = threading.Lock()
+
+def get_http_session(provider):
+    """Return the shared requests.Session for a provider, creating it on first use."""
+    session = _http_sessions.get(provider)
+    if session is not None:
+        return session
+    with _http_lock:
+        session = _http_sessions.get(provider)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 504) if provider in THROTTLE_503_PROVIDERS else (500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+                raise_on_status=False,
+                respect_retry_after_header=False,   # 429/503 + Retry-After are http_request's to handle
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(PROVIDER_DEFAULTS.get(provider, {}).get("headers", {}))
+            _http_sessions[provider] = session
+    return session
+
+# 🚦 Per-provider rate limiting (token bucket, Retry-After aware)
+# Requests per second and burst size; override with RATE_LIMIT_<PROVIDER>=rate[:burst]
+RATE_LIMIT_DEFAULTS = {
+    "spotify":      (10.0, 10),
+    "lastfm":       (5.0, 5),
+    "lastfm_web":   (2.0, 2),
+    "musicbrainz":  (1.0, 1),
+    "discogs":      (1.0, 5),     # 60/min authenticated
+    "youtube":      (5.0, 5),
+    "audiodb":      (2.0, 2),
+    "listenbrainz": (5.0, 5),
+    "navidrome":    (20.0, 20),
+}
+RATE_LIMIT_MIN_FRACTION = 0.1    # adaptive backoff never drops below 10% of the budget
+RATE_LIMIT_MAX_BACKOFF = 120.0   # seconds
+
+def parse_retry_after(value):
+    """Retry-After may be delta-seconds or an HTTP date; return seconds or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class RateLimiter:
+    """Thread-safe token bucket with adaptive slowdown after 429 responses."""
+
+    def __init__(self, provider, rate, burst):
+        self.provider = provider
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self.blocked_until - now, -self.tokens / self.rate)
+            rate = self.rate
+        if GLOBAL_RATE_BUDGETS:
+            # shared with every other worker process using the same queue database
+            wait = max(wait, reserve_global_slot(self.provider, rate))
+        with self.lock:
+            self.requests += 1
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.consecutive_throttles = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttled(self, retry_after=None):
+        with self.lock:
+            self.throttled += 1
+            self.consecutive_throttles += 1
+            self.rate = max(self.max_rate * RATE_LIMIT_MIN_FRACTION, self.rate * 0.5)
+            delay = retry_after if retry_after is not None else 2 ** self.consecutive_throttles
+            delay = min(delay, RATE_LIMIT_MAX_BACKOFF)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.tokens = min(self.tokens, 0.0)
+        if GLOBAL_RATE_BUDGETS:
+            push_global_backoff(self.provider, delay)
+        return delay
+
+    def state(self):
+        with self.lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "tokens": round(self.tokens, 2),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited, 2),
+                "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            }
+
+_rate_limiters = {}
+
+def get_rate_limiter(provider):
+    limiter = _rate_limiters.get(provider)
+    if limiter is not None:
+        return limiter
+    with _http_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None:
+            rate, burst = RATE_LIMIT_DEFAULTS.get(provider, (5.0, 5))
+            override = os.getenv(f"RATE_LIMIT_{provider.upper()}")
+            if override:
+                try:
+                    parts = override.split(":")
+                    rate = float(parts[0])
+                    burst = int(parts[1]) if len(parts) > 1 else max(1, int(rate))
+                except ValueError:
+                    print(f"⚠️ Invalid RATE_LIMIT_{provider.upper()}='{override}' — using defaults.")
+            limiter = RateLimiter(provider, rate, burst)
+            _rate_limiters[provider] = limiter
+    return limiter
+
+def get_rate_limiter_state():
+    """Snapshot of every limiter that has been used, keyed by provider."""
+    return {name: limiter.state() for name, limiter in sorted(_rate_limiters.items())}
+
+def print_rate_limiter_state():
+    state = get_rate_limiter_state()
+    if not state:
+        return
+    print(f"\n🚦 Rate limiter state:")
+    bottleneck = max(state.items(), key=lambda kv: kv[1]["waited_s"])[0]
+    for name, st in state.items():
+        marker = " ⬅ bottleneck" if name == bottleneck and st["waited_s"] > 0 else ""
+        print(f"- {name}: {st['requests']} req | waited {st['waited_s']}s | 429s: {st['throttled']} "
+              f"| rate {st['rate']}/{st['max_rate']} req/s{marker}")
+
+# 📊 Metrics: per-provider/endpoint requests, errors, 429s, latency histograms, cache hit ratios
+METRICS_FILE = os.getenv("SPTNR_METRICS_FILE", os.path.join(DATA_DIR, "sptnr_metrics.prom"))
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+METRICS_WORKER = None   # queue workers: label every series and write one file per worker
+
+_metrics_lock = threading.Lock()
+_metrics_write_lock = threading.Lock()
+_request_metrics = {}   # (provider, endpoint) -> counters + per-bucket latency counts
+_cache_metrics = {}     # cache name -> {"hits", "misses"}
+
+# Per-provider path templates, first match wins; keeps label series bounded
+METRICS_ENDPOINT_TEMPLATES = {
+    "lastfm_web":  ((r"^/music/[^/]+/_/[^/]+$", "/music/:artist/_/:track"),
+                    (r"^/music/[^/]+/[^/]+/[^/]+$", "/music/:artist/:album/:track"),
+                    (r"^/music/[^/]+/[^/]+$", "/music/:artist/:track"),
+                    (r"^/music/[^/]+/?$", "/music/:artist")),
+    "spotify":     ((r"^/v1/(albums|artists|tracks|playlists|audio-features)/[^/]+/([a-z-]+)$", r"/v1/\1/:id/\2"),
+                    (r"^/v1/(albums|artists|tracks|playlists|audio-features)/[^/]+$", r"/v1/\1/:id")),
+    "musicbrainz": ((r"^/ws/2/([a-z-]+)/[^/]+$", r"/ws/2/\1/:mbid"),),
+    "discogs":     ((r"^/(releases|masters|artists|labels)/[^/]+(/[a-z]+)?$", r"/\1/:id\2"),),
+    "navidrome":   ((r"^.*(/rest/[\w.]+)$", r"\1"),),   # drop any reverse-proxy prefix
+}
+
+def metrics_endpoint(url, params=None, provider=None):
+    """
+    Low-cardinality endpoint label: the Last.fm API method, the provider's path template
+    (e.g. lastfm_web "/music/:artist/:track"), or the path with non-static segments collapsed.
+    """
+    if params and isinstance(params, dict) and params.get("method"):
+        return params["method"]
+    path = url.split("?", 1)[0].split("://", 1)[-1]
+    path = path[path.find("/"):] if "/" in path else "/"
+    for pattern, template in METRICS_ENDPOINT_TEMPLATES.get(provider, ()):
+        if re.match(pattern, path):
+            return re.sub(pattern, template, path)
+    segments = [seg if re.fullmatch(r"[a-z0-9][a-z0-9_.-]{0,31}", seg) and not re.search(r"\d{3}", seg) else ":id"
+                for seg in path.split("/") if seg]
+    return "/" + "/".join(segments)
+
+def record_request(provider, endpoint, seconds, status=None, throttled=None):
+    """status None means the request raised (timeout, connection error); throttled defaults to a 429."""
+    with _metrics_lock:
+        m = _request_metrics.get((provider, endpoint))
+        if m is None:
+            m = _request_metrics[(provider, endpoint)] = {
+                "requests": 0, "errors": 0, "throttled": 0, "latency_sum": 0.0,
+                "buckets": [0] * len(METRICS_LATENCY_BUCKETS),
+            }
+        m["requests"] += 1
+        m["latency_sum"] += seconds
+        if throttled if throttled is not None else status == 429:
+            m["throttled"] += 1
+        elif status is None or (status >= 400 and status != 404):
+            m["errors"] += 1
+        for i, bound in enumerate(METRICS_LATENCY_BUCKETS):
+            if seconds <= bound:
+                m["buckets"][i] += 1
+                break
+
+def record_cache(cache, hit, count=1):
+    if count <= 0:
+        return
+    with _metrics_lock:
+        c = _cache_metrics.setdefault(cache, {"hits": 0, "misses": 0})
+        c["hits" if hit else "misses"] += count
+
+def metrics_snapshot():
+    with _metrics_lock:
+        return ({k: dict(v, buckets=list(v["buckets"])) for k, v in _request_metrics.items()},
+                {k: dict(v) for k, v in _cache_metrics.items()})
+
+def _histogram_quantile(buckets, q):
+    total = sum(buckets)
+    if not total:
+        return None
+    rank, seen = q * total, 0
+    for bound, n in zip(METRICS_LATENCY_BUCKETS, buckets):
+        seen += n
+        if seen >= rank:
+            return bound if bound != float("inf") else METRICS_LATENCY_BUCKETS[-2]
+    return None
+
+def get_metrics(since=None):
+    """
+    JSON-friendly summary per provider (with endpoints) and per cache; pass a
+    metrics_snapshot() as since for the delta over one artist.
+    """
+    requests_now, caches_now = metrics_snapshot()
+    requests_then, caches_then = since or ({}, {})
+    providers = {}
+    for (provider, endpoint), m in sorted(requests_now.items()):
+        old = requests_then.get((provider, endpoint))
+        if old:
+            m = {"requests": m["requests"] - old["requests"], "errors": m["errors"] - old["errors"],
+                 "throttled": m["throttled"] - old["throttled"],
+                 "latency_sum": m["latency_sum"] - old["latency_sum"],
+                 "buckets": [a - b for a, b in zip(m["buckets"], old["buckets"])]}
+        if not m["requests"]:
+            continue
+        p = providers.setdefault(provider, {"requests": 0, "errors": 0, "throttled": 0, "latency_sum": 0.0,
+                                            "buckets": [0] * len(METRICS_LATENCY_BUCKETS), "endpoints": {}})
+        for key in ("requests", "errors", "throttled", "latency_sum"):
+            p[key] += m[key]
+        p["buckets"] = [a + b for a, b in zip(p["buckets"], m["buckets"])]
+        p["endpoints"][endpoint] = {"requests": m["requests"], "errors": m["errors"], "throttled": m["throttled"],
+                                    "mean_s": round(m["latency_sum"] / m["requests"], 4)}
+    for p in providers.values():
+        buckets, latency_sum = p.pop("buckets"), p.pop("latency_sum")
+        p["latency"] = {"mean_s": round(latency_sum / p["requests"], 4),
+                        "p50_le_s": _histogram_quantile(buckets, 0.5),
+                        "p95_le_s": _histogram_quantile(buckets, 0.95)}
+
+    caches = {}
+    for name, c in sorted(caches_now.items()):
+        old = caches_then.get(name, {"hits": 0, "misses": 0})
+        hits, misses = c["hits"] - old["hits"], c["misses"] - old["misses"]
+        if hits or misses:
+            caches[name] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 3)}
+    return {"providers": providers, "caches": caches}
+
+def metrics_prometheus():
+    """Prometheus text exposition of the cumulative counters."""
+    requests_now, caches_now = metrics_snapshot()
+    lines = []
+
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"')
+
+    worker = f'worker="{esc(METRICS_WORKER)}",' if METRICS_WORKER else ""
+
+    for name, key, help_text in (
+        ("sptnr_http_requests_total", "requests", "HTTP requests sent, including retries"),
+        ("sptnr_http_errors_total", "errors", "Failed requests (exceptions and 4xx/5xx other than 404 and rate limiting)"),
+        ("sptnr_http_throttled_total", "throttled", "Rate-limited responses (429, or 503 where the provider throttles with it)"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (provider, endpoint), m in sorted(requests_now.items()):
+            lines.append(f'{name}{{{worker}provider="{esc(provider)}",endpoint="{esc(endpoint)}"}} {m[key]}')
+
+    name = "sptnr_http_request_duration_seconds"
+    lines += [f"# HELP {name} HTTP request latency", f"# TYPE {name} histogram"]
+    for (provider, endpoint), m in sorted(requests_now.items()):
+        labels = f'{worker}provider="{esc(provider)}",endpoint="{esc(endpoint)}"'
+        cumulative = 0
+        for bound, n in zip(METRICS_LATENCY_BUCKETS, m["buckets"]):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {m['latency_sum']:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {m['requests']}")
+
+    for name, key in (("sptnr_cache_hits_total", "hits"), ("sptnr_cache_misses_total", "misses")):
+        lines += [f"# HELP {name} Cache lookups that were {'served' if key == 'hits' else 'not served'} from cache",
+                  f"# TYPE {name} counter"]
+        for cache, c in sorted(caches_now.items()):
+            lines.append(f'{name}{{{worker}cache="{esc(cache)}"}} {c[key]}')
+    return "\n".join(lines) + "\n"
+
+def metrics_file_path():
+    """METRICS_FILE, or a per-worker sibling (sptnr_metrics.<host>_<pid>.prom) in queue workers."""
+    if not METRICS_WORKER:
+        return METRICS_FILE
+    root, ext = os.path.splitext(METRICS_FILE)
+    return f"{root}.{re.sub(r'[^A-Za-z0-9_.-]', '_', METRICS_WORKER)}{ext}"
+
+def enable_worker_metrics():
+    global METRICS_WORKER
+    METRICS_WORKER = WORKER_ID
+
+def write_metrics_file(path=None):
+    """
+    Atomically write the Prometheus text file (e.g. for node_exporter's textfile collector).
+    Writers in this process take turns via a temp file; queue processes each write their own
+    file (see metrics_file_path), so they never overwrite one another's counters.
+    """
+    import tempfile
+    path = path or metrics_file_path()
+    tmp = None
+    try:
+        with _metrics_write_lock:
+            ensure_parent_dir(path)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path) or ".",
+                                             prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                             delete=False) as f:
+                tmp = f.name
+                f.write(metrics_prometheus())
+            os.chmod(tmp, 0o644)      # mkstemp files are owner-only; collectors must read it
+            os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to {path}: {e}")
+        if tmp:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+def start_metrics_server(port):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = json.dumps(get_metrics()).encode("utf-8"), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = metrics_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *a):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="sptnr-metrics", daemon=True).start()
+    print(f"📊 Metrics on http://0.0.0.0:{port}/metrics")
+    return server
+
+def print_metrics_summary(since=None, label=None, compact=False):
+    """JSON metrics summary (delta since a snapshot, when given); also refreshes METRICS_FILE."""
+    summary = get_metrics(since)
+    write_metrics_file()
+    if not summary["providers"] and not summary["caches"]:
+        return
+    title = f"📊 Metrics ({label})" if label else "📊 Metrics"
+    if compact:
+        print(f"{title}: {json.dumps(summary, separators=(',', ':'))}")
+    else:
+        print(f"\n{title}:\n{json.dumps(summary, indent=2)}")
+
+# ⏱️ Stage timing spans: thread-seconds per named stage, per album / artist / process
+RATE_STAGES = ("album_fetch", "artist_index", "spotify_match", "lastfm", "score", "genres",
+               "singles", "scoring", "persist", "playlist", "navidrome_push")
+stage_totals = {}          # process-wide, for batch summaries
+_stage_lock = threading.Lock()
+_stage_local = threading.local()
+
+@contextmanager
+def stage_collector(*collectors):
+    """Route stage spans of the current thread (e.g. a pool worker) into these dicts too."""
+    previous = getattr(_stage_local, "collectors", ())
+    _stage_local.collectors = previous + tuple(c for c in collectors if all(c is not p for p in previous))
+    try:
+        yield
+    finally:
+        _stage_local.collectors = previous
+
+def bind_stage_collectors(fn):
+    """Wrap fn so spans it records from another thread land in the caller's collectors."""
+    collectors = getattr(_stage_local, "collectors", ())
+
+    def bound(*a, **kw):
+        with stage_collector(*collectors):
+            return fn(*a, **kw)
+    return bound
+
+@contextmanager
+def stage_span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stage_lock:
+            stage_totals[name] = stage_totals.get(name, 0.0) + elapsed
+            for collector in getattr(_stage_local, "collectors", ()):
+                collector[name] = collector.get(name, 0.0) + elapsed
+
+def format_stage_timings(timings, wall=None):
+    parts = [f"{name} {timings[name]:.2f}s" for name in RATE_STAGES if timings.get(name)]
+    parts += [f"{name} {secs:.2f}s" for name, secs in timings.items() if name not in RATE_STAGES and secs]
+    line = " | ".join(parts) or "-"
+    return f"{line} | wall {wall:.2f}s" if wall is not None else line
+
+def print_stage_totals():
+    with _stage_lock:
+        totals = dict(stage_totals)
+    if not totals:
+        return
+    total = sum(totals.values())
+    print(f"\n⏱️ Stage totals (thread-seconds; parallel stages can exceed wall time):")
+    for name in sorted(totals, key=totals.get, reverse=True):
+        print(f"- {name}: {totals[name]:.2f}s ({totals[name] / total * 100:.1f}%)")
+
+# 🔬 --profile: cProfile per artist → .prof (snakeviz/gprof2dot), sorted .txt and collapsed stacks
+PROFILE_DIR = None         # set by --profile
+PROFILE_TOP = 40
+_profile_lock = threading.Lock()
+
+def _profile_slug(label):
+    return re.sub(r"[^\w.-]+", "_", label).strip("_")[:80] or "artist"
+
+def write_collapsed_stacks(stats, path):
+    """
+    Approximate flamegraph input (flamegraph.pl / speedscope "collapsed" format): each
+    function's own time on the stack built from its heaviest caller chain.
+    """
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    raw = stats.stats   # func -> (cc, nc, tottime, cumtime, callers)
+    with open(path, "w", encoding="utf-8") as f:
+        for func, (_, _, tottime, _, _) in raw.items():
+            micros = int(tottime * 1e6)
+            if micros <= 0:
+                continue
+            chain, seen, current = [label(func)], {func}, func
+            while True:
+                callers = raw.get(current, (0, 0, 0, 0, {}))[4]
+                candidates = [c for c in callers if c not in seen]
+                if not candidates:
+                    break
+                current = max(candidates, key=lambda c: raw.get(c, (0, 0, 0, 0))[3])
+                seen.add(current)
+                chain.append(label(current))
+            f.write(f"{';'.join(reversed(chain))} {micros}\n")
+
+@contextmanager
+def profile_artist(artist_name):
+    """cProfile the calling thread while rating one artist, when --profile is on."""
+    if not PROFILE_DIR:
+        yield
+        return
+    import cProfile, pstats, io
+    profiler = cProfile.Profile()
+    # one active profiler at a time (a hard limit on Python 3.12+)
+    if not _profile_lock.acquire(blocking=False):
+        print(f"⚠️ Profiler busy — rating '{artist_name}' without profiling")
+        yield
+        return
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{_profile_slug(artist_name)}")
+        profiler.dump_stats(f"{base}.prof")
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+        stats.sort_stats("tottime").print_stats(PROFILE_TOP)
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        write_collapsed_stacks(stats, f"{base}.collapsed")
+        print(f"🔬 Profile written: {base}.prof / .txt / .collapsed")
+    finally:
+        _profile_lock.release()
+
+def http_request(provider, method, url, **kwargs):
+    """
+    Send a request through the provider's pooled session with its default timeout,
+    paced by the provider's rate limiter. 429 responses (and 503s from THROTTLE_503_PROVIDERS)
+    are retried after Retry-After (or exponential backoff) and slow the provider's budget down adaptively.
+    """
+    kwargs.setdefault("timeout", PROVIDER_DEFAULTS.get(provider, {}).get("timeout", HTTP_TIMEOUT))
+    session = get_http_session(provider)
+    limiter = get_rate_limiter(provider)
+    endpoint = metrics_endpoint(url, kwargs.get("params"), provider)
+    for attempt in range(HTTP_RETRIES + 1):
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            res = session.request(method, url, **kwargs)
+        except Exception:
+            record_request(provider, endpoint, time.monotonic() - start)
+            raise
+        throttled = res.status_code == 429 or (res.status_code == 503 and provider in THROTTLE_503_PROVIDERS)
+        record_request(provider, endpoint, time.monotonic() - start, res.status_code, throttled)
+        if not throttled:
+            limiter.on_success()
+            return res
+        delay = limiter.on_throttled(parse_retry_after(res.headers.get("Retry-After")))
+        if attempt < HTTP_RETRIES:
+            print(f"{LIGHT_YELLOW}⏳ {provider} rate limited ({res.status_code}) — backing off {delay:.1f}s{RESET}")
+    return res
+
+# 💾 Response cache for provider GETs, keyed on (endpoint, normalized params)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_REFRESH = False   # set by --force: always revalidate, still store results
+
+# (ttl days, negative ttl days) — negative applies to 404s and empty result sets
+HTTP_CACHE_TTL_DAYS = {
+    "spotify":      (1, 1),
+    "lastfm":       (1, 1),
+    "lastfm_web":   (7, 3),
+    "musicbrainz":  (28, 7),
+    "discogs":      (14, 3),
+    "youtube":      (7, 3),
+    "audiodb":      (30, 7),
+    "listenbrainz": (1, 1),
+    "navidrome":    (0, 0),      # local server, and setRating is a GET — never cache
+}
+HTTP_CACHE_SECRET_PARAMS = {"key", "api_key", "token", "u", "p", "t", "s"}
+HTTP_CACHE_PRUNE_DAYS = 30   # keep expired rows this long for conditional revalidation
+
+def http_cache_ttl(provider):
+    ttl, negative = HTTP_CACHE_TTL_DAYS.get(provider, (0, 0))
+    override = os.getenv(f"HTTP_CACHE_TTL_{provider.upper()}_DAYS")
+    if override:
+        try:
+            ttl = float(override)
+            negative = min(negative, ttl)
+        except ValueError:
+            pass
+    return ttl * 86400, negative * 86400
+
+def http_cache_key(url, params=None):
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items()
+                   if k not in HTTP_CACHE_SECRET_PARAMS and v is not None)
+    return url.rstrip("/") + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+NOT_FOUND_ERROR_CODES = {6}   # Last.fm "invalid parameters" = artist/track not found
+
+def _classify_payload(body):
+    """
+    "empty" for misses worth negative-caching (Last.fm error 6, or all result lists empty),
+    "error" for other API error bodies — transient failures such as Last.fm 8/11/16/29,
+    never cached — and "ok" otherwise.
+    """
+    try:
+        data = json.loads(body)
+    except Exception:
+        return "ok"
+    if not isinstance(data, dict):
+        return "empty" if data == [] else "ok"
+    if "error" in data:   # Last.fm reports failures as 200 + {"error": <code>, "message": ...}
+        return "empty" if data["error"] in NOT_FOUND_ERROR_CODES else "error"
+    lists = []
+    for v in data.values():
+        if isinstance(v, list):
+            lists.append(v)
+        elif isinstance(v, dict):
+            lists.extend(x for x in v.values() if isinstance(x, list))
+    return "empty" if lists and all(len(x) == 0 for x in lists) else "ok"
+
+def _response_from_cache(url, status, content_type, body):
+    import requests
+    res = requests.Response()
+    res.status_code = status
+    res._content = body
+    res.url = url
+    res.reason = "OK" if status == 200 else "Not Found"
+    res.encoding = "utf-8"
+    res.headers["Content-Type"] = content_type or "application/json"
+    res.headers["X-Sptnr-Cache"] = "hit"
+    return res
+
+def prune_http_cache(conn=None):
+    conn = conn or get_cache_db()
+    with conn:
+        conn.execute("DELETE FROM http_cache WHERE expires_at < ?",
+                     (time.time() - HTTP_CACHE_PRUNE_DAYS * 86400,))
+
+def cached_http_get(provider, url, ttl, negative_ttl, **kwargs):
+    global _http_cache_pruned
+    key = http_cache_key(url, kwargs.get("params"))
+    conn = get_cache_db()
+    if not _http_cache_pruned:
+        _http_cache_pruned = True     # once per process, on the first cached request
+        prune_http_cache(conn)
+    row = conn.execute(
+        "SELECT status, content_type, body, etag, last_modified, expires_at FROM http_cache WHERE key = ?",
+        (key,)
+    ).fetchone()
+    now = time.time()
+    if row and row[5] > now and not HTTP_CACHE_REFRESH:
+        record_cache("http", True)
+        return _response_from_cache(url, row[0], row[1], row[2])
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if row and row[0] == 200:
+        if row[3]:
+            headers["If-None-Match"] = row[3]
+        if row[4]:
+            headers["If-Modified-Since"] = row[4]
+    res = http_request(provider, "GET", url, headers=headers, **kwargs)
+    record_cache("http", res.status_code == 304 and bool(row))   # a 304 is served from cache
+
+    if res.status_code == 304 and row:
+        with conn:
+            conn.execute("UPDATE http_cache SET fetched_at = ?, expires_at = ? WHERE key = ?",
+                         (now, now + ttl, key))
+        return _response_from_cache(url, row[0], row[1], row[2])
+
+    kind = "empty" if res.status_code == 404 else _classify_payload(res.content)
+    if res.status_code in (200, 404) and kind != "error":
+        expires = now + (negative_ttl if kind == "empty" else ttl)
+        if expires > now:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO http_cache "
+                    "(key, provider, status, content_type, body, etag, last_modified, fetched_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, res.status_code, res.headers.get("Content-Type"), res.content,
+                     res.headers.get("ETag"), res.headers.get("Last-Modified"), now, expires)
+                )
+    return res
+
+def http_get(provider, url, **kwargs):
+    ttl, negative_ttl = http_cache_ttl(provider) if HTTP_CACHE_ENABLED else (0, 0)
+    if ttl <= 0:
+        return http_request(provider, "GET", url, **kwargs)
+    return cached_http_get(provider, url, ttl, negative_ttl, **kwargs)
+
+def http_post(provider, url, **kwargs):
+    return http_request(provider, "POST", url, **kwargs)
+
 def strip_parentheses(s):
     return re.sub(r"\s*\(.*?\)\s*", " ", s).strip()
 
@@ -69,14 +1049,23 @@ def score_by_age(playcount, release_str):
     except:
         return 0, 9999
 
+def spotify_get(path, params=None):
+    """GET a Spotify Web API path with the shared token; refreshes the token once on 401."""
+    url = path if path.startswith("http") else f"https://api.spotify.com/v1/{path.lstrip('/')}"
+    headers = {"Authorization": f"Bearer " + get_spotify_token()}
+    res = http_get("spotify", url, headers=headers, params=params)
+    if res.status_code == 401:
+        # Token revoked or expired early — refresh once and retry
+        invalidate_spotify_token()
+        headers = {"Authorization": f"Bearer " + get_spotify_token()}
+        res = http_get("spotify", url, headers=headers, params=params)
+    res.raise_for_status()
+    return res.json()
+
 def search_spotify_track(title, artist, album=None):
     def query(q):
         params = {"q": q, "type": "track", "limit": 10}
-        token = get_spotify_token()
-        headers = {"Authorization": f"Bearer " + token}
-        res = requests.get("https://api.spotify.com/v1/search", headers=headers, params=params)
-        res.raise_for_status()
-        return res.json().get("tracks", {}).get("items", [])
+        return spotify_get("search", params).get("tracks", {}).get("items", [])
 
     queries = [
         f"{title} artist:{artist} album:{album}" if album else None,
@@ -101,6 +1090,101 @@ def select_best_spotify_match(results, track_title):
     filtered = [r for r in results if not re.search(r"(unplugged|live|remix|edit|version)", r["name"].lower())]
     return max(filtered, key=lambda r: r.get("popularity", 0)) if filtered else {"popularity": 0}
 
+# 💿 Album-first Spotify matching: one album lookup instead of ~3 searches per track
+SPOTIFY_ALBUM_MATCH = os.getenv("SPOTIFY_ALBUM_MATCH", "1") != "0"
+SPOTIFY_IDS_PER_REQUEST = 50
+
+def find_spotify_album(album_name, artist):
+    """Resolve a Navidrome album to a Spotify album object (or None)."""
+    try:
+        items = spotify_get("search", {
+            "q": f"album:{album_name} artist:{artist}", "type": "album", "limit": 5
+        }).get("albums", {}).get("items", [])
+    except Exception as e:
+        print(f"⚠️ Spotify album lookup failed for '{album_name}': {type(e).__name__} - {e}")
+        return None
+    if not items:
+        return None
+
+    wanted = normalize_title(album_name)
+    for a in items:
+        if normalize_title(a.get("name", "")) == wanted:
+            return a
+    import difflib
+    names = [normalize_title(a.get("name", "")) for a in items]
+    close = [n for n in difflib.get_close_matches(wanted, names, n=3, cutoff=0.8) if same_numbers(n, wanted)]
+    return items[names.index(close[0])] if close else None
+
+def same_numbers(a, b):
+    """Fuzzy matches must agree on numbers: 'Vol 1' is not 'Vol 2', 'Part II' is not 'Part III'."""
+    def numbers(s):
+        return [w for w in s.split() if w.isdigit() or re.fullmatch(r"[ivx]+", w)]
+    return numbers(a) == numbers(b)
+
+def fetch_spotify_album_tracks(album_id):
+    """Full track objects (with popularity) for a Spotify album, batched via /v1/tracks?ids=."""
+    track_ids = []
+    page = spotify_get(f"albums/{album_id}/tracks", {"limit": 50})
+    while page:
+        track_ids += [t["id"] for t in page.get("items", []) if t.get("id")]
+        page = spotify_get(page["next"]) if page.get("next") else None
+
+    tracks = []
+    for i in range(0, len(track_ids), SPOTIFY_IDS_PER_REQUEST):
+        chunk = track_ids[i:i + SPOTIFY_IDS_PER_REQUEST]
+        tracks += [t for t in spotify_get("tracks", {"ids": ",".join(chunk)}).get("tracks", []) if t]
+    return tracks
+
+def match_spotify_album_tracks(nav_tracks, album_name, artist):
+    """
+    Map Navidrome track ids to Spotify track objects from the matching Spotify album.
+    Titles are matched exactly, then without parentheticals, then fuzzily (numbers must
+    agree); each Spotify track is used once. Tracks that do not match are left out so the
+    caller can fall back to per-track search.
+    """
+    if not SPOTIFY_ALBUM_MATCH or not album_name or album_name == "Unknown Album":
+        return {}
+    album = find_spotify_album(album_name, artist)
+    if not album:
+        return {}
+    try:
+        sp_tracks = fetch_spotify_album_tracks(album["id"])
+    except Exception as e:
+        print(f"⚠️ Spotify album tracks failed for '{album_name}': {type(e).__name__} - {e}")
+        return {}
+
+    def title_keys(name):
+        # Spotify appends version info as " - Remastered 2017"; Navidrome usually uses "(...)"
+        return (canonical_title(name), normalize_title(name),
+                normalize_title(re.sub(r"\s+-\s+.*$", "", name)))
+
+    by_title = {}
+    for t in sp_tracks:
+        for k in title_keys(t.get("name", "")):
+            by_title.setdefault(k, t)
+
+    matches, used = {}, set()
+    unmatched = []
+    for track in nav_tracks:
+        hit = next((by_title[k] for k in title_keys(track.get("title", ""))
+                    if k in by_title and by_title[k].get("id") not in used), None)
+        if hit:
+            matches[track["id"]] = hit
+            used.add(hit.get("id"))
+        else:
+            unmatched.append(track)
+
+    # fuzzy pass only over Spotify tracks no exact match claimed
+    import difflib
+    for track in unmatched:
+        title = normalize_title(track.get("title", ""))
+        titles = [k for k, t in by_title.items() if t.get("id") not in used]
+        close = [k for k in difflib.get_close_matches(title, titles, n=3, cutoff=0.85) if same_numbers(k, title)]
+        if close:
+            hit = by_title[close[0]]
+            matches[track["id"]] = hit
+            used.add(hit.get("id"))
+    return matches
 
 def build_cache_entry(stars, score, artist=None):
     return {
@@ -121,25 +1205,17 @@ def canonical_title(title):
     return re.sub(r"[^\w\s]", "", title.lower()).strip()
 
 def get_resume_artist_from_cache():
-    cache = load_rating_cache()
-    latest_time = datetime.min
-    latest_track_id = None
-
-    for tid, entry in cache.items():
-        ts = entry.get("last_scanned")
-        if ts:
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S")
-                if dt > latest_time:
-                    latest_time = dt
-                    latest_track_id = tid
-            except:
-                continue
-
-    if not latest_track_id:
+    row = get_cache_db().execute(
+        "SELECT track_id, artist FROM ratings WHERE last_scanned IS NOT NULL "
+        "ORDER BY last_scanned DESC LIMIT 1"
+    ).fetchone()
+    if not row:
         return None
+    latest_track_id, latest_artist = row
+    if latest_artist:
+        return latest_artist
 
-    # Attempt reverse match using artist_index.json
+    # Attempt reverse match using the cached artist index
     artist_map = load_artist_index()
     for name, artist_id in artist_map.items():
         if str(artist_id) in latest_track_id:
@@ -176,23 +1252,79 @@ def print_rating_summary(rated_tracks, skipped):
         print(f"\n🛑 Skipped {skipped} track{'s' if skipped != 1 else ''} (cached <7 days, use --force to override)")
 
 
-def load_rating_cache():
-    if os.path.exists(RATING_CACHE_FILE):
-        with open(RATING_CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+def load_rating_cache(track_ids=None):
+    """Rating cache as {track_id: entry}; pass track_ids to read only those rows."""
+    conn = get_cache_db()
+    if track_ids is None:
+        rows = conn.execute("SELECT track_id, artist, stars, score, last_scanned FROM ratings").fetchall()
+    else:
+        ids = list(track_ids)
+        rows = []
+        for i in range(0, len(ids), CACHE_BATCH_SIZE):
+            chunk = ids[i:i + CACHE_BATCH_SIZE]
+            rows += conn.execute(
+                f"SELECT track_id, artist, stars, score, last_scanned FROM ratings "
+                f"WHERE track_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+    return {tid: {"stars": stars, "score": score, "artist": artist, "last_scanned": ts}
+            for tid, artist, stars, score, ts in rows}
 
 def load_channel_cache():
-    if os.path.exists(CHANNEL_CACHE_FILE):
-        with open(CHANNEL_CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    """Channel verdicts as {channel_id: {official, title, last_checked}}."""
+    rows = get_cache_db().execute("SELECT channel_id, verdict, title, last_checked FROM channels").fetchall()
+    return {cid: {"official": bool(verdict), "title": title, "last_checked": ts}
+            for cid, verdict, title, ts in rows}
 
-channel_cache = load_channel_cache()
+channel_cache = None   # loaded by get_channel_verdicts() on first use
 
 def save_channel_cache(cache):
-    with open(CHANNEL_CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2)
+    """Upsert channel verdicts (only the entries passed in are written)."""
+    _executemany_batched(CHANNEL_UPSERT_SQL, [_channel_row(cid, v) for cid, v in cache.items()])
+
+def load_artist_index():
+    rows = get_cache_db().execute("SELECT name, artist_id FROM artist_index ORDER BY name").fetchall()
+    return {name: artist_id for name, artist_id in rows}
+
+def save_artist_index(artist_map):
+    """Replace the cached Navidrome artist index with {name: artist_id}."""
+    conn = get_cache_db()
+    with conn:
+        conn.execute("DELETE FROM artist_index")
+        conn.executemany(ARTIST_UPSERT_SQL, [(n, str(aid)) for n, aid in artist_map.items()])
+
+def has_artist_index():
+    return get_cache_db().execute("SELECT 1 FROM artist_index LIMIT 1").fetchone() is not None
+
+def get_meta(key, default=None):
+    row = get_cache_db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def set_meta(key, value):
+    conn = get_cache_db()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+def load_provider_index(provider, artist, ttl_days):
+    """Stored per-artist provider index (e.g. MusicBrainz release groups) if younger than ttl_days."""
+    row = get_cache_db().execute(
+        "SELECT data, fetched_at FROM provider_index WHERE provider = ? AND artist = ?",
+        (provider, artist.lower())
+    ).fetchone()
+    try:
+        fresh = row is not None and \
+                datetime.now() - datetime.strptime(row[1], "%Y-%m-%dT%H:%M:%S") < timedelta(days=ttl_days)
+    except (TypeError, ValueError):
+        fresh = False
+    record_cache(f"{provider}_index", fresh)
+    return json.loads(row[0]) if fresh else None
+
+def save_provider_index(provider, artist, data):
+    conn = get_cache_db()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO provider_index (provider, artist, data, fetched_at) VALUES (?, ?, ?, ?)",
+            (provider, artist.lower(), json.dumps(data), datetime.now().strftime("%Y-%m-%dT%H:%M:%S"))
+        )
 
 def search_youtube_video(title, artist):
     global youtube_api_unavailable
@@ -211,80 +1343,131 @@ def search_youtube_video(title, artist):
         "key": api_key
     }
 
+    from requests.exceptions import HTTPError, RequestException
     try:
-        res = requests.get(url, params=params)
+        res = http_get("youtube", url, params=params)
         res.raise_for_status()
         data = res.json()
         return data.get("items", [])
-    except requests.exceptions.HTTPError as e:
+    except HTTPError as e:
         code = e.response.status_code
         reason = e.response.reason
         youtube_api_unavailable = True
         print(f"{LIGHT_RED}🚫 YouTube API disabled for session ({code} {reason}) — skipping future scans{RESET}")
         return []
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         youtube_api_unavailable = True
         print(f"{LIGHT_RED}⚠️ YouTube API unreachable — disabled for session ({type(e).__name__}){RESET}")
         return []
 
-import difflib
+CHANNEL_TTL_DAYS = int(os.getenv("CHANNEL_TTL_DAYS", "90"))
+CHANNEL_BATCH_SIZE = 50   # channels.list accepts up to 50 ids per call
+CHANNEL_KEYWORDS = ("official", "records", "label", "vevo")
 
-def is_official_youtube_channel(channel_id, artist=None):
-    # Load trusted channel IDs from .env
-    trusted_raw = os.getenv("TRUSTED_CHANNEL_IDS", "")
-    trusted_env = [c.strip() for c in trusted_raw.split(",") if c.strip()]
-    if channel_id in trusted_env:
-        channel_cache[channel_id] = True
-        return True
+_channel_lock = threading.Lock()
 
-    # Already cached
-    if channel_id in channel_cache:
-        return channel_cache[channel_id]
-
-    api_key = os.getenv("YOUTUBE_API_KEY")
-    url = "https://www.googleapis.com/youtube/v3/channels"
-    params = {
-        "part": "snippet",
-        "id": channel_id,
-        "key": api_key
-    }
+def _trusted_channel_ids():
+    trusted_raw = os.getenv("TRUSTED_CHANNEL_IDS", "")
+    return {c.strip() for c in trusted_raw.split(",") if c.strip()}
 
+def _channel_entry_fresh(entry):
     try:
-        res = requests.get(url, params=params)
-        res.raise_for_status()
-        data = res.json().get("items", [])
-        if not data:
-            result = False
-        else:
-            snippet = data[0]["snippet"]
-            title = snippet["title"].lower()
-            description = snippet.get("description", "").lower()
+        checked = datetime.strptime(entry.get("last_checked") or "", "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return False
+    return datetime.now() - checked < timedelta(days=CHANNEL_TTL_DAYS)
 
-            # Trust keywords
-            keywords = ["official", "records", "label", "vevo"]
-            result = any(k in title or k in description for k in keywords)
+def _channel_verdict(entry, artist=None):
+    """Keyword verdict is cached; the artist fuzzy match is applied per lookup."""
+    if entry.get("official"):
+        return True
+    title = (entry.get("title") or "").lower()
+    if artist and title:
+        import difflib
+        return difflib.SequenceMatcher(None, artist.lower(), title).ratio() >= 0.75
+    return False
+
+def fetch_channel_entries(channel_ids, api_key):
+    """Look up channel snippets via channels.list, up to 50 ids per request."""
+    entries = {}
+    ids = list(dict.fromkeys(channel_ids))
+    for i in range(0, len(ids), CHANNEL_BATCH_SIZE):
+        chunk = ids[i:i + CHANNEL_BATCH_SIZE]
+        res = http_get("youtube", "https://www.googleapis.com/youtube/v3/channels",
+                       params={"part": "snippet", "id": ",".join(chunk), "key": api_key,
+                               "maxResults": CHANNEL_BATCH_SIZE})
+        res.raise_for_status()
+        now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        found = {item["id"]: item.get("snippet", {}) for item in res.json().get("items", [])}
+        for cid in chunk:
+            snippet = found.get(cid)
+            if snippet is None:
+                entries[cid] = {"official": False, "title": "", "last_checked": now}
+                continue
+            t = (snippet.get("title") or "").lower()
+            d = (snippet.get("description") or "").lower()
+            entries[cid] = {
+                "official": any(k in t or k in d for k in CHANNEL_KEYWORDS),
+                "title": snippet.get("title") or "",
+                "last_checked": now,
+            }
+    return entries
+
+def get_channel_verdicts(channel_ids, artist=None, api_key=None):
+    """
+    Official-channel verdicts for several channels at once. Fresh cached entries are
+    reused; missing or stale ones are fetched in batches and persisted.
+    """
+    trusted = _trusted_channel_ids()
+    api_key = api_key or os.getenv("YOUTUBE_API_KEY")
+    wanted = [cid for cid in dict.fromkeys(channel_ids) if cid and cid not in trusted]
+
+    global channel_cache
+    # the lock only guards the in-memory cache; channels.list runs outside it so
+    # --workers threads don't queue behind each other's YouTube calls
+    with _channel_lock:
+        if channel_cache is None:
+            channel_cache = load_channel_cache()
+        missing = [cid for cid in wanted
+                   if cid not in channel_cache or not _channel_entry_fresh(channel_cache[cid])]
+        known = {cid: channel_cache[cid] for cid in wanted if cid in channel_cache}
+    record_cache("channel", True, len(wanted) - len(missing))
+    record_cache("channel", False, len(missing))
+    if missing and api_key:
+        try:
+            fetched = fetch_channel_entries(missing, api_key)
+            with _channel_lock:
+                channel_cache.update(fetched)
+            save_channel_cache(fetched)
+            known.update(fetched)
+        except Exception as e:
+            print(f"{LIGHT_RED}⚠️ YouTube channel check failed: {type(e).__name__} - {e}{RESET}")
 
-            # Fuzzy match with artist name
-            if artist:
-                artist_norm = artist.lower()
-                match_ratio = difflib.SequenceMatcher(None, artist_norm, title).ratio()
-                if match_ratio >= 0.75:
-                    result = True
+    verdicts = {}
+    for cid in channel_ids:
+        if cid in trusted:
+            verdicts[cid] = True
+        else:
+            verdicts[cid] = _channel_verdict(known.get(cid, {}), artist)
+    return verdicts
 
-    except Exception as e:
-        print(f"{LIGHT_RED}⚠️ YouTube channel check failed: {type(e).__name__} - {e}{RESET}")
-        result = False
+def is_official_youtube_channel(channel_id, artist=None):
+    return get_channel_verdicts([channel_id], artist)[channel_id]
 
-    channel_cache[channel_id] = result
-    return result
 
+# --- Optional dependency (imported on first use) ---
+BeautifulSoup = None
+HAVE_BS4 = None   # unknown until have_bs4() is called
 
-# --- Optional dependency (safe import) ---
-try:
-    from bs4 import BeautifulSoup
-    HAVE_BS4 = True
-except Exception:
-    HAVE_BS4 = False
+def have_bs4():
+    global BeautifulSoup, HAVE_BS4
+    if HAVE_BS4 is None:
+        try:
+            from bs4 import BeautifulSoup
+            HAVE_BS4 = True
+        except Exception:
+            HAVE_BS4 = False
+    return HAVE_BS4
 
 def normalize_title(s):
     s = s.lower()
@@ -296,11 +1479,11 @@ def normalize_title(s):
 
 def is_lastfm_single(title, artist):
     """Heuristic: a Last.fm track page that shows a single 'tracklist' entry."""
-    if not HAVE_BS4:
+    if not have_bs4():
         return False
     url = f"https://www.last.fm/music/{artist.replace(' ', '+')}/{title.replace(' ', '+')}"
     try:
-        res = requests.get(url, timeout=6)
+        res = http_get("lastfm_web", url)
         res.raise_for_status()
         soup = BeautifulSoup(res.text, "html.parser")
         # very light heuristic; adjust if you prefer another selector
@@ -317,19 +1500,21 @@ def is_youtube_single(title, artist, youtube_api_key):
         return False
     try:
         q = f"{artist} {title} official video"
-        res = requests.get("https://www.googleapis.com/youtube/v3/search",
-                           params={"part":"snippet","q":q,"type":"video","maxResults":3,"key":youtube_api_key},
-                           timeout=8)
+        res = http_get("youtube", "https://www.googleapis.com/youtube/v3/search",
+                       params={"part":"snippet","q":q,"type":"video","maxResults":3,"key":youtube_api_key})
         res.raise_for_status()
         items = res.json().get("items", [])
         if not items:
             return False
 
+        # one batched channels.list call (and one cache lookup) for every candidate channel
+        official = get_channel_verdicts([v["snippet"]["channelId"] for v in items], artist, youtube_api_key)
+
         nav_title = normalize_title(title)
         for v in items:
             yt_title = normalize_title(v["snippet"]["title"])
             cid = v["snippet"]["channelId"]
-            if "official video" in yt_title and nav_title in yt_title and looks_like_official_channel(cid, artist, youtube_api_key):
+            if "official video" in yt_title and nav_title in yt_title and official[cid]:
                 return True
 
         # fuzzy fallback
@@ -338,39 +1523,25 @@ def is_youtube_single(title, artist, youtube_api_key):
         match = next(iter(difflib.get_close_matches(nav_title, yt_titles, n=1, cutoff=0.7)), None)
         if match:
             v = next(x for x in items if normalize_title(x["snippet"]["title"]) == match)
-            return looks_like_official_channel(v["snippet"]["channelId"], artist, youtube_api_key)
+            return official[v["snippet"]["channelId"]]
         return False
     except Exception:
         return False
 
 def looks_like_official_channel(channel_id, artist, youtube_api_key):
-    try:
-        res = requests.get("https://www.googleapis.com/youtube/v3/channels",
-                           params={"part":"snippet", "id":channel_id, "key":youtube_api_key},
-                           timeout=8)
-        res.raise_for_status()
-        items = res.json().get("items", [])
-        if not items: return False
-        t = (items[0]["snippet"]["title"] or "").lower()
-        d = (items[0]["snippet"].get("description") or "").lower()
-        # keyword + fuzzy artist hit
-        kw = any(k in t or k in d for k in ("official","records","label","vevo"))
-        import difflib
-        fuzzy = difflib.SequenceMatcher(None, artist.lower(), t).ratio() >= 0.75
-        return kw or fuzzy
-    except Exception:
-        return False
+    return get_channel_verdicts([channel_id], artist, youtube_api_key)[channel_id]
 
 
-def is_musicbrainz_single(title, artist):
-    """Query release-group by title+artist and check primary-type=Single."""
+def is_musicbrainz_single(title, artist, mb_index=None):
+    """Query release-group by title+artist and check primary-type=Single.
+    With an artist index from build_musicbrainz_artist_index the answer is local."""
+    if mb_index is not None:
+        return musicbrainz_index_single(mb_index, title)
     try:
-        res = requests.get(
-            "https://musicbrainz.org/ws/2/release-group/",
+        res = http_get(
+            "musicbrainz", "https://musicbrainz.org/ws/2/release-group/",
             params={"query": f'"{title}" AND artist:"{artist}" AND primarytype:Single',
-                    "fmt": "json", "limit": 5},
-            headers={"User-Agent": "sptnr-cli/1.0 (support@example.com)"},
-            timeout=8
+                    "fmt": "json", "limit": 5}
         )
         res.raise_for_status()
         rgs = res.json().get("release-groups", [])
@@ -380,16 +1551,82 @@ def is_musicbrainz_single(title, artist):
 
 
 
-def is_discogs_single_titleaware(title, artist, token):
-    """Discogs 'Single' format with title-aware match to avoid false positives."""
+# 🗂️ MusicBrainz artist index: resolve MBID once, browse all release groups (100/page)
+MB_INDEX_TTL_DAYS = int(os.getenv("MB_INDEX_TTL_DAYS", "28"))
+MB_BROWSE_LIMIT = 100
+
+def resolve_musicbrainz_artist(artist):
+    """Best-matching MusicBrainz artist MBID for a name, or None."""
+    res = http_get("musicbrainz", "https://musicbrainz.org/ws/2/artist/",
+                   params={"query": f'artist:"{artist}"', "fmt": "json", "limit": 5})
+    res.raise_for_status()
+    candidates = res.json().get("artists", [])
+    wanted = artist.lower()
+    exact = [a for a in candidates if (a.get("name") or "").lower() == wanted]
+    if exact:
+        return max(exact, key=lambda a: int(a.get("score", 0)))["id"]
+    if candidates and int(candidates[0].get("score", 0)) >= 90:
+        return candidates[0]["id"]
+    return None
+
+def build_musicbrainz_artist_index(artist, force=False):
+    """
+    {"mbid": ..., "singles": [normalized titles]} for every Single release group of
+    the artist. Stored in the cache store for MB_INDEX_TTL_DAYS; None on failure or when
+    the artist can't be resolved, so callers fall back to per-track searches.
+    """
+    if not force:
+        cached = load_provider_index("musicbrainz", artist, MB_INDEX_TTL_DAYS)
+        if cached is not None and cached.get("mbid"):   # older runs stored unresolved artists too
+            return cached
+    try:
+        mbid = resolve_musicbrainz_artist(artist)
+        if not mbid:
+            return None
+        singles = set()
+        offset, total = 0, 1
+        while offset < total:
+            res = http_get("musicbrainz", "https://musicbrainz.org/ws/2/release-group",
+                           params={"artist": mbid, "fmt": "json",
+                                   "limit": MB_BROWSE_LIMIT, "offset": offset})
+            res.raise_for_status()
+            data = res.json()
+            groups = data.get("release-groups", [])
+            for rg in groups:
+                if (rg.get("primary-type") or "").lower() != "single":
+                    continue
+                # double A-sides are titled "A / B"
+                for part in re.split(r"\s+/\s+", rg.get("title") or ""):
+                    singles.add(normalize_title(part))
+            total = int(data.get("release-group-count", 0))
+            offset += MB_BROWSE_LIMIT
+            if not groups:
+                break
+        index = {"mbid": mbid, "singles": sorted(singles)}
+        save_provider_index("musicbrainz", artist, index)
+        return index
+    except Exception as e:
+        print(f"⚠️ MusicBrainz index failed for '{artist}': {type(e).__name__} - {e}")
+        return None
+
+def musicbrainz_index_single(mb_index, title):
+    singles = mb_index.get("_singles_set")
+    if singles is None:
+        singles = mb_index["_singles_set"] = set(mb_index.get("singles", []))
+    return normalize_title(title) in singles
+
+def is_discogs_single_titleaware(title, artist, token, discogs_index=None):
+    """Discogs 'Single' format with title-aware match to avoid false positives.
+    With an artist index from build_discogs_artist_index the answer is local."""
+    if discogs_index is not None:
+        return discogs_index_single(discogs_index, title, artist)
     if not token:
         return False
-    headers = {"Authorization": f"Discogs token={token}", "User-Agent": "sptnr-cli/1.0"}
+    headers = {"Authorization": f"Discogs token={token}"}
     try:
-        res = requests.get("https://api.discogs.com/database/search",
-                           headers=headers,
-                           params={"q": f"{artist} {title}", "type":"release", "format":"Single", "per_page":5},
-                           timeout=8)
+        res = http_get("discogs", "https://api.discogs.com/database/search",
+                       headers=headers,
+                       params={"q": f"{artist} {title}", "type":"release", "format":"Single", "per_page":5})
         res.raise_for_status()
         title_norm = normalize_title(title)
         artist_norm = normalize_title(artist)
@@ -402,41 +1639,184 @@ def is_discogs_single_titleaware(title, artist, token):
     except Exception:
         return False
 
+# 🗂️ Discogs artist index: one paged release crawl serves single detection and genres
+DISCOGS_INDEX_TTL_DAYS = int(os.getenv("DISCOGS_INDEX_TTL_DAYS", "14"))
+DISCOGS_INDEX_MAX_PAGES = int(os.getenv("DISCOGS_INDEX_MAX_PAGES", "10"))
+DISCOGS_PER_PAGE = 100
+
+def build_discogs_artist_index(artist, token, force=False):
+    """
+    {"releases": [{"title", "track_title", "formats", "genres", "styles"}]} for the
+    artist's Discogs releases (database search filtered by artist, 100 per page).
+    Stored in the cache store for DISCOGS_INDEX_TTL_DAYS; None without a token or on
+    failure so callers fall back to per-track searches.
+    """
+    if not token:
+        return None
+    if not force:
+        cached = load_provider_index("discogs", artist, DISCOGS_INDEX_TTL_DAYS)
+        if cached is not None:
+            return cached
+    headers = {"Authorization": f"Discogs token={token}"}
+    try:
+        releases = []
+        page, pages = 1, 1
+        while page <= min(pages, DISCOGS_INDEX_MAX_PAGES):
+            res = http_get("discogs", "https://api.discogs.com/database/search",
+                           headers=headers,
+                           params={"artist": artist, "type": "release",
+                                   "per_page": DISCOGS_PER_PAGE, "page": page})
+            res.raise_for_status()
+            data = res.json()
+            for r in data.get("results", []):
+                full_title = r.get("title") or ""
+                # search titles are "Artist - Title"
+                track_part = full_title.split(" - ", 1)[1] if " - " in full_title else full_title
+                releases.append({
+                    "title": normalize_title(full_title),
+                    "track_title": normalize_title(track_part),
+                    "formats": r.get("format", []),
+                    "genres": r.get("genre", []),
+                    "styles": r.get("style", []),
+                })
+            pages = int(data.get("pagination", {}).get("pages", 1) or 1)
+            page += 1
+        index = {"releases": releases}
+        save_provider_index("discogs", artist, index)
+        return index
+    except Exception as e:
+        print(f"⚠️ Discogs index failed for '{artist}': {type(e).__name__} - {e}")
+        return None
 
-def load_single_cache():
-    if os.path.exists(SINGLE_CACHE_FILE):
-        with open(SINGLE_CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+def discogs_index_single(discogs_index, title, artist):
+    """A 'Single' release whose own title (artist prefix stripped) equals this title."""
+    title_norm = normalize_title(title)
+    if not title_norm:
+        return False
+    return any("Single" in r["formats"] and r["track_title"] == title_norm
+               for r in discogs_index.get("releases", []))
+
+def discogs_index_genres(discogs_index, title):
+    """Genres + styles of releases carrying this title; artist-wide top genres otherwise."""
+    title_norm = normalize_title(title)
+    counts = {}
+    for r in discogs_index.get("releases", []):
+        if r["track_title"] == title_norm:
+            for g in r["genres"] + r["styles"]:
+                counts[g] = counts.get(g, 0) + 1
+    if not counts:
+        for r in discogs_index.get("releases", []):
+            for g in r["genres"]:
+                counts[g] = counts.get(g, 0) + 1
+        return [g for g, _ in sorted(counts.items(), key=lambda kv: -kv[1])[:3]]
+    return [g for g, _ in sorted(counts.items(), key=lambda kv: -kv[1])]
+
+
+def single_cache_key(artist, title):
+    return f"{artist.lower()}::{title.lower()}"
+
+def load_single_cache(artist=None):
+    """Single verdicts as {artist::title: entry}; pass artist to read only that artist's rows."""
+    sql = "SELECT key, is_single, confidence, sources, skipped, last_scanned FROM singles"
+    if artist is None:
+        rows = get_cache_db().execute(sql).fetchall()
+    else:
+        rows = get_cache_db().execute(sql + " WHERE artist = ?", (artist.lower(),)).fetchall()
+    return {key: {"is_single": bool(is_single), "confidence": confidence,
+                  "sources": json.loads(sources or "[]"), "skipped": json.loads(skipped or "[]"),
+                  "last_scanned": ts}
+            for key, is_single, confidence, sources, skipped, ts in rows}
 
 def save_single_cache(cache):
-    with open(SINGLE_CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2)
+    """Upsert single verdicts (only the entries passed in are written)."""
+    _executemany_batched(SINGLE_UPSERT_SQL, [_single_row(k, e) for k, e in cache.items()])
 
 def save_rating_cache(cache):
-    with open(RATING_CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2)
+    """Upsert rating entries (only the entries passed in are written)."""
+    _executemany_batched(RATING_UPSERT_SQL, [_rating_row(tid, e) for tid, e in cache.items()])
 
-def get_spotify_token():
-    auth_str = f"{client_id}:{client_secret}"
-    auth_bytes = auth_str.encode("utf-8")
-    auth_base64 = base64.b64encode(auth_bytes).decode("utf-8")
+SPOTIFY_TOKEN_FILE = os.path.join(DATA_DIR, "spotify_token.json")
+SPOTIFY_TOKEN_MARGIN = int(os.getenv("SPOTIFY_TOKEN_MARGIN", "60"))  # refresh this many seconds early
 
-    headers = {
-        "Authorization": f"Basic {auth_base64}",
-        "Content-Type": "application/x-www-form-urlencoded"
-    }
-    data = {"grant_type": "client_credentials"}
+_spotify_token = {"access_token": None, "expires_at": 0.0, "client": None}
+_spotify_token_lock = threading.Lock()
+
+def _spotify_client_fingerprint():
+    return hashlib.sha1(f"{client_id}:{client_secret}".encode("utf-8")).hexdigest()[:12]
 
+def _load_spotify_token_file():
+    """Pick up a still-valid token left by a previous process (e.g. the previous artist in a batch)."""
     try:
-        res = requests.post("https://accounts.spotify.com/api/token", headers=headers, data=data)
-        res.raise_for_status()
-        return res.json()["access_token"]
-    except requests.exceptions.HTTPError as e:
-        error_info = res.json()
-        error_description = error_info.get("error_description", "Unknown error")
-        logging.error(f"{LIGHT_RED}Spotify Authentication Error: {error_description}{RESET}")
-        sys.exit(1)
+        with open(SPOTIFY_TOKEN_FILE, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if entry.get("client") == _spotify_client_fingerprint():
+            _spotify_token.update(entry)
+    except Exception:
+        pass
+
+def _save_spotify_token_file():
+    """The file holds a live bearer token: create it owner-only (0600), whatever the umask."""
+    try:
+        ensure_parent_dir(SPOTIFY_TOKEN_FILE)
+        fd = os.open(SPOTIFY_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)      # tighten a file left readable by an older version
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_spotify_token, f)
+    except Exception:
+        pass
+
+def _spotify_token_valid():
+    return bool(_spotify_token["access_token"]) and \
+        time.time() < _spotify_token["expires_at"] - SPOTIFY_TOKEN_MARGIN
+
+def invalidate_spotify_token():
+    """Drop the cached token so the next get_spotify_token() call re-authenticates."""
+    with _spotify_token_lock:
+        _spotify_token.update({"access_token": None, "expires_at": 0.0})
+        _save_spotify_token_file()
+
+def get_spotify_token():
+    """Return a cached client-credentials token, refreshing it shortly before it expires."""
+    if _spotify_token_valid():
+        return _spotify_token["access_token"]
+
+    with _spotify_token_lock:
+        if _spotify_token_valid():
+            return _spotify_token["access_token"]
+        if _spotify_token["client"] is None:
+            _load_spotify_token_file()
+            if _spotify_token_valid():
+                return _spotify_token["access_token"]
+
+        require_spotify_credentials()
+        from requests.exceptions import HTTPError
+        auth_str = f"{client_id}:{client_secret}"
+        auth_bytes = auth_str.encode("utf-8")
+        auth_base64 = base64.b64encode(auth_bytes).decode("utf-8")
+
+        headers = {
+            "Authorization": f"Basic {auth_base64}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        data = {"grant_type": "client_credentials"}
+
+        try:
+            res = http_post("spotify", "https://accounts.spotify.com/api/token", headers=headers, data=data)
+            res.raise_for_status()
+            payload = res.json()
+        except HTTPError:
+            error_info = res.json()
+            error_description = error_info.get("error_description", "Unknown error")
+            logging.error(f"{LIGHT_RED}Spotify Authentication Error: {error_description}{RESET}")
+            sys.exit(1)
+
+        _spotify_token.update({
+            "access_token": payload["access_token"],
+            "expires_at": time.time() + int(payload.get("expires_in", 3600)),
+            "client": _spotify_client_fingerprint(),
+        })
+        _save_spotify_token_file()
+        return _spotify_token["access_token"]
 
 def get_auth_params():
     base = os.getenv("NAV_BASE_URL")
@@ -455,7 +1835,6 @@ def get_auth_params():
 
 def get_lastfm_track_info(artist, title):
     api_key = os.getenv("LASTFMAPIKEY")
-    headers = {"User-Agent": "sptnr-cli"}
     params = {
         "method": "track.getInfo",
         "artist": artist,
@@ -465,7 +1844,7 @@ def get_lastfm_track_info(artist, title):
     }
 
     try:
-        res = requests.get("https://ws.audioscrobbler.com/2.0/", headers=headers, params=params)
+        res = http_get("lastfm", "https://ws.audioscrobbler.com/2.0/", params=params)
         res.raise_for_status()
         data = res.json().get("track", {})
         track_play = int(data.get("playcount", 0))
@@ -475,34 +1854,228 @@ def get_lastfm_track_info(artist, title):
         print(f"⚠️ Last.fm fetch failed for '{title}': {type(e).__name__} - {e}")
         return None
 
-def detect_single_status(title, artist, cache={}, force=False,
+# 📊 Bulk Last.fm: artist stats + top tracks fetched once per artist, matched locally
+LASTFM_TOPTRACKS_PAGES = int(os.getenv("LASTFM_TOPTRACKS_PAGES", "3"))
+LASTFM_TOPTRACKS_LIMIT = 1000
+
+def _lastfm_call(method, **params):
+    params.update({"method": method, "api_key": os.getenv("LASTFMAPIKEY"), "format": "json"})
+    res = http_get("lastfm", "https://ws.audioscrobbler.com/2.0/", params=params)
+    res.raise_for_status()
+    return res.json()
+
+def build_lastfm_artist_index(artist):
+    """
+    Returns {"artist_play": int, "tracks": {normalized title: playcount}} from one
+    artist.getInfo call plus paged artist.getTopTracks, or None if Last.fm fails.
+    """
+    try:
+        info = _lastfm_call("artist.getInfo", artist=artist).get("artist", {})
+        artist_play = int(info.get("stats", {}).get("playcount", 0) or 0)
+
+        tracks = {}
+        page, total_pages = 1, 1
+        while page <= min(total_pages, LASTFM_TOPTRACKS_PAGES):
+            top = _lastfm_call("artist.getTopTracks", artist=artist,
+                               limit=LASTFM_TOPTRACKS_LIMIT, page=page).get("toptracks", {})
+            for t in top.get("track", []):
+                play = int(t.get("playcount", 0) or 0)
+                for key in (normalize_title(t.get("name", "")), canonical_title(t.get("name", ""))):
+                    # keep the most-played variant when titles collide
+                    if key and play > tracks.get(key, -1):
+                        tracks[key] = play
+            total_pages = int(top.get("@attr", {}).get("totalPages", 1) or 1)
+            page += 1
+        return {"artist_play": artist_play, "tracks": tracks}
+    except Exception as e:
+        print(f"⚠️ Last.fm bulk fetch failed for '{artist}': {type(e).__name__} - {e}")
+        return None
+
+def lookup_lastfm_index(index, title):
+    """Track/artist playcounts from a bulk index, or None when the title is not indexed."""
+    if not index:
+        return None
+    for key in (normalize_title(title), canonical_title(title)):
+        if key in index["tracks"]:
+            return {"track_play": index["tracks"][key], "artist_play": index["artist_play"]}
+    return None
+
+# 🧮 Single-source evaluation engine
+SINGLE_SOURCES_REQUIRED = 2      # positives needed for is_single
+SINGLE_FANOUT_WORKERS = int(os.getenv("SINGLE_FANOUT_WORKERS", "4"))
+
+# name -> (available(ctx), local(ctx), check(ctx), quota-expensive)
+SINGLE_SOURCES = {
+    "musicbrainz": (
+        lambda c: True,
+        lambda c: c["mb_index"] is not None,
+        lambda c: is_musicbrainz_single(c["title"], c["artist"], c["mb_index"]),
+        False,
+    ),
+    "discogs": (
+        lambda c: bool(c["discogs_token"]) or c["discogs_index"] is not None,
+        lambda c: c["discogs_index"] is not None,
+        lambda c: is_discogs_single_titleaware(c["title"], c["artist"], c["discogs_token"], c["discogs_index"]),
+        False,
+    ),
+    "lastfm": (
+        lambda c: c["use_lastfm"] and have_bs4(),
+        lambda c: False,
+        lambda c: is_lastfm_single(c["title"], c["artist"]),
+        False,
+    ),
+    "youtube": (
+        lambda c: bool(c["youtube_api_key"]) and not youtube_api_unavailable,
+        lambda c: False,
+        lambda c: is_youtube_single(c["title"], c["artist"], c["youtube_api_key"]),
+        True,     # search.list costs 100 quota units — only spend it when decisive
+    ),
+}
+
+single_source_stats = {name: {"calls": 0, "hits": 0, "seconds": 0.0} for name in SINGLE_SOURCES}
+_single_stats_lock = threading.Lock()
+_single_pool = None
+
+def _get_single_pool():
+    global _single_pool
+    if _single_pool is None:
+        with _single_stats_lock:
+            if _single_pool is None:
+                _single_pool = ThreadPoolExecutor(max_workers=SINGLE_FANOUT_WORKERS,
+                                                  thread_name_prefix="sptnr-single")
+    return _single_pool
+
+def _run_single_source(name, ctx):
+    start = time.monotonic()
+    try:
+        hit = bool(SINGLE_SOURCES[name][2](ctx))
+    except Exception:
+        hit = False
+    with _single_stats_lock:
+        st = single_source_stats[name]
+        st["calls"] += 1
+        st["hits"] += int(hit)
+        st["seconds"] += time.monotonic() - start
+    return hit
+
+def single_source_cost(name):
+    """Measured seconds spent per positive answer (with a mild prior for unseen sources)."""
+    st = single_source_stats[name]
+    avg = (st["seconds"] + 0.5) / (st["calls"] + 1)
+    hit_rate = (st["hits"] + 1) / (st["calls"] + 2)
+    return avg / hit_rate
+
+def get_single_source_stats():
+    with _single_stats_lock:
+        return {name: dict(st, cost=round(single_source_cost(name), 4))
+                for name, st in single_source_stats.items()}
+
+def _single_decided(positives, remaining):
+    return positives >= SINGLE_SOURCES_REQUIRED or positives + remaining < SINGLE_SOURCES_REQUIRED
+
+def evaluate_single_sources(ctx):
+    """
+    Run single-detection sources in three tiers — in-memory index lookups inline,
+    network sources in parallel, quota-expensive sources (YouTube) last — ordered by
+    measured cost per hit, and stop as soon as is_single can no longer change.
+    Returns (positive sources, skipped sources).
+    """
+    available = [n for n, (avail, _, _, _) in SINGLE_SOURCES.items() if avail(ctx)]
+    local     = sorted((n for n in available if SINGLE_SOURCES[n][1](ctx)), key=single_source_cost)
+    network   = sorted((n for n in available if n not in local and not SINGLE_SOURCES[n][3]),
+                       key=single_source_cost)
+    expensive = sorted((n for n in available if n not in local and SINGLE_SOURCES[n][3]),
+                       key=single_source_cost)
+
+    positives, done = [], set()
+
+    def remaining():
+        return len(available) - len(done)
+
+    for name in local:
+        if _single_decided(len(positives), remaining()):
+            break
+        done.add(name)
+        if _run_single_source(name, ctx):
+            positives.append(name)
+
+    if network and not _single_decided(len(positives), remaining()):
+        if len(network) == 1:
+            done.add(network[0])
+            if _run_single_source(network[0], ctx):
+                positives.append(network[0])
+        else:
+            pool = _get_single_pool()
+            futures = {pool.submit(_run_single_source, n, ctx): n for n in network}
+            for fut in as_completed(futures):
+                name = futures[fut]
+                done.add(name)
+                if fut.result():
+                    positives.append(name)
+                if _single_decided(len(positives), remaining()):
+                    # sources already running spent their requests: report them as run, not skipped
+                    for f, other in futures.items():
+                        if other not in done and not f.cancel():
+                            done.add(other)
+                    break
+
+    for name in expensive:
+        if _single_decided(len(positives), remaining()):
+            break
+        done.add(name)
+        if _run_single_source(name, ctx):
+            positives.append(name)
+
+    # report in a stable order regardless of completion order
+    order = list(SINGLE_SOURCES)
+    positives.sort(key=order.index)
+    skipped = [n for n in available if n not in done]
+    return positives, skipped
+
+# ⏱️ How long a single verdict stays fresh, by confidence (days)
+SINGLE_TTL_DAYS = {
+    "high":   int(os.getenv("SINGLE_TTL_HIGH_DAYS", "180")),
+    "medium": int(os.getenv("SINGLE_TTL_MEDIUM_DAYS", "30")),
+    "low":    int(os.getenv("SINGLE_TTL_LOW_DAYS", "7")),
+}
+
+def is_single_entry_fresh(entry, now=None):
+    last_ts = entry.get("last_scanned")
+    if not last_ts:
+        return False
+    try:
+        scanned_date = datetime.strptime(last_ts, "%Y-%m-%dT%H:%M:%S")
+    except Exception:
+        return False
+    ttl = SINGLE_TTL_DAYS.get(entry.get("confidence"), SINGLE_TTL_DAYS["low"])
+    return (now or datetime.now()) - scanned_date < timedelta(days=ttl)
+
+def detect_single_status(title, artist, cache=None, force=False,
                          youtube_api_key=None, discogs_token=None,
-                         known_list=None, use_lastfm=True):
+                         known_list=None, use_lastfm=True, mb_index=None, discogs_index=None):
     """
     Decide single status by aggregating multiple signals.
-    - Cache hit (you already store last_scanned) respected unless 'force' is True.
+    - Cache hit respected unless 'force' is True; freshness TTL depends on the
+      cached confidence (SINGLE_TTL_DAYS).
     - Signals: Last.fm heuristic (optional), MusicBrainz, YouTube official channel (optional),
                Discogs 'Single' (title-aware), and optional config 'known_singles' list.
-    Returns dict: {is_single: bool, confidence: 'low'|'medium'|'high', sources: [..], last_scanned: iso}
+    - Sources are evaluated by evaluate_single_sources(); those not needed to settle
+      the verdict are listed under 'skipped'.
+    Returns dict: {is_single: bool, confidence: 'low'|'medium'|'high', sources: [..],
+                   skipped: [..], last_scanned: iso}
     """
-    key = f"{artist.lower()}::{title.lower()}"
+    if cache is None:
+        cache = {}
+    key = single_cache_key(artist, title)
     entry = cache.get(key)
 
-    # ⏱️ Skip fresh scans unless forced (7 days)
-    if entry and not force:
-        last_ts = entry.get("last_scanned")
-        if last_ts:
-            try:
-                scanned_date = datetime.strptime(last_ts, "%Y-%m-%dT%H:%M:%S")
-                if datetime.now() - scanned_date < timedelta(days=7):
-                    return entry
-            except Exception:
-                pass
-
-    sources = []
-
-    # ✅ Known singles list (from config) acts as a high-confidence shortcut
+    # ✅ Known singles list (from config) acts as a high-confidence shortcut; checked before the
+    #    stored verdict so titles added to the list apply without waiting for its TTL
     if known_list and title in known_list:
+        if entry and not force and entry.get("sources") == ["known_list"] and is_single_entry_fresh(entry):
+            record_cache("single", True)
+            return entry
+        record_cache("single", False)
         result = {
             "is_single": True,
             "confidence": "high",
@@ -512,34 +2085,467 @@ def detect_single_status(title, artist, cache={}, force=False,
         cache[key] = result
         return result
 
-    # 🧪 Multi-source signals
-    if use_lastfm and _is_lastfm_single(title, artist):
-        sources.append("lastfm")
-
-    if _is_musicbrainz_single(title, artist):
-        sources.append("musicbrainz")
-
-    if _is_youtube_single(title, artist, youtube_api_key):
-        sources.append("youtube")
-
-    if _is_discogs_single_titleaware(title, artist, discogs_token):
-        sources.append("discogs")
+    # ⏱️ Skip fresh scans unless forced
+    if entry and not force and is_single_entry_fresh(entry):
+        record_cache("single", True)
+        return entry
+    record_cache("single", False)
+
+    # 🧪 Multi-source signals, cheapest first, stopping once the verdict is settled
+    ctx = {
+        "title": title, "artist": artist, "use_lastfm": use_lastfm,
+        "youtube_api_key": youtube_api_key, "discogs_token": discogs_token,
+        "mb_index": mb_index, "discogs_index": discogs_index,
+    }
+    sources, skipped = evaluate_single_sources(ctx)
 
     confidence = "high" if len(sources) >= 2 else ("medium" if len(sources) == 1 else "low")
     result = {
         "is_single": len(sources) >= 2,
         "confidence": confidence,
         "sources": sources,
+        "skipped": skipped,
         "last_scanned": datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
     }
 
     cache[key] = result
     return result
 
+# 🔁 Incremental scanning: album fingerprints + Navidrome library change time
+ALBUM_STALE_DAYS = int(os.getenv("ALBUM_STALE_DAYS", "30"))   # refresh unchanged albums after this
+ALBUM_SIGNAL_MAX_DAYS = int(os.getenv("ALBUM_SIGNAL_MAX_DAYS", "180"))  # re-fetch provider signals after this
+
+def album_fingerprint(album, tracks):
+    """Stable hash of an album's track ids, track count and Navidrome modification time."""
+    changed = album.get("changed") or album.get("created") or ""
+    ids = sorted(str(t.get("id")) for t in tracks)
+    raw = f"{len(ids)}|{changed}|{','.join(ids)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def load_album_state(album_id):
+    row = get_cache_db().execute(
+        "SELECT fingerprint, last_enriched, last_rescored FROM album_state WHERE album_id = ?", (album_id,)
+    ).fetchone()
+    return {"fingerprint": row[0], "last_enriched": row[1], "last_rescored": row[2]} if row else None
+
+def save_album_state(album_id, artist, album, tracks):
+    """Record a full enrichment: fresh provider signals, so any earlier re-score is superseded."""
+    conn = get_cache_db()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO album_state "
+            "(album_id, artist, fingerprint, track_count, changed, last_enriched, last_rescored) "
+            "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+            (album_id, artist, album_fingerprint(album, tracks), len(tracks),
+             album.get("changed") or album.get("created"), datetime.now().strftime("%Y-%m-%dT%H:%M:%S"))
+        )
+
+def mark_album_rescored(album_id):
+    """Stamp a re-score from stored signals; last_enriched keeps the age of the signals themselves."""
+    conn = get_cache_db()
+    with conn:
+        conn.execute("UPDATE album_state SET last_rescored = ? WHERE album_id = ?",
+                     (datetime.now().strftime("%Y-%m-%dT%H:%M:%S"), album_id))
+
+def album_scan_mode(album_id, album, tracks):
+    """
+    "enrich" for new or changed albums and for unchanged ones whose signals are older than
+    ALBUM_SIGNAL_MAX_DAYS; "rescore" for unchanged ones last enriched or re-scored more than
+    ALBUM_STALE_DAYS ago (re-banded from track_signals, no network); else "skip".
+    """
+    state = load_album_state(album_id)
+    if not state or state["fingerprint"] != album_fingerprint(album, tracks):
+        return "enrich"
+    try:
+        enriched = datetime.strptime(state["last_enriched"], "%Y-%m-%dT%H:%M:%S")
+    except (TypeError, ValueError):
+        return "enrich"
+    now = datetime.now()
+    if now - enriched >= timedelta(days=ALBUM_SIGNAL_MAX_DAYS):
+        return "enrich"
+    try:
+        refreshed = max(enriched, datetime.strptime(state["last_rescored"], "%Y-%m-%dT%H:%M:%S"))
+    except (TypeError, ValueError):
+        refreshed = enriched
+    return "rescore" if now - refreshed >= timedelta(days=ALBUM_STALE_DAYS) else "skip"
+
+def save_track_signals(album_id, tracks):
+    """Persist raw per-track signals (in album order) so stars can be recomputed offline."""
+    rows = []
+    for position, t in enumerate(tracks):
+        rows.append((
+            t["id"], t.get("artist"), album_id, t.get("album"), position, t.get("title"),
+            t.get("spotify_score"), t.get("spotify_popularity"), t.get("lastfm_track_playcount"),
+            t.get("lastfm_artist_playcount"), t.get("lastfm_ratio"), t.get("listenbrainz_score"),
+            t.get("age_score"), int(bool(t.get("is_single"))), t.get("single_confidence"),
+            json.dumps(t.get("single_sources", [])), t.get("score"), t.get("stars"), t.get("last_scanned"),
+        ))
+    _executemany_batched(SIGNAL_UPSERT_SQL, rows)
+
+def load_track_signals(artists=None, album_id=None):
+    """Stored signal rows as track dicts, grouped by album in original track order."""
+    sql = f"SELECT {', '.join(SIGNAL_COLUMNS)} FROM track_signals"
+    params = []
+    if artists:
+        sql += f" WHERE artist IN ({','.join('?' * len(artists))})"
+        params = list(artists)
+    elif album_id is not None:
+        sql += " WHERE album_id = ?"
+        params = [album_id]
+    sql += " ORDER BY artist, album_id, position"
+    tracks = []
+    for row in get_cache_db().execute(sql, params):
+        t = dict(zip(SIGNAL_COLUMNS, row))
+        t["id"] = t.pop("track_id")
+        t["is_single"] = bool(t["is_single"])
+        t["single_sources"] = json.loads(t["single_sources"] or "[]")
+        tracks.append(t)
+    return tracks
+
+def stale_album_artists():
+    """Artists with an album due for a re-score (ALBUM_STALE_DAYS) or a re-enrich (ALBUM_SIGNAL_MAX_DAYS)."""
+    now = datetime.now()
+    stale = (now - timedelta(days=ALBUM_STALE_DAYS)).strftime("%Y-%m-%dT%H:%M:%S")
+    expired = (now - timedelta(days=ALBUM_SIGNAL_MAX_DAYS)).strftime("%Y-%m-%dT%H:%M:%S")
+    rows = get_cache_db().execute(
+        "SELECT DISTINCT artist FROM album_state "
+        "WHERE COALESCE(last_rescored, last_enriched) < ? OR last_enriched < ?", (stale, expired)
+    ).fetchall()
+    return {r[0] for r in rows}
+
+def get_library_last_modified(since=None):
+    """Navidrome getIndexes lastModified (ms); with ifModifiedSince the index body stays empty if unchanged."""
+    nav_base, auth = get_auth_params()
+    if not nav_base:
+        return None
+    params = dict(auth)
+    if since:
+        params["ifModifiedSince"] = since
+    try:
+        res = http_get("navidrome", f"{nav_base}/rest/getIndexes.view", params=params)
+        res.raise_for_status()
+        indexes = res.json().get("subsonic-response", {}).get("indexes", {})
+        return int(indexes.get("lastModified", 0) or 0)
+    except Exception as e:
+        print(f"⚠️ Could not read Navidrome library change time: {type(e).__name__} - {e}")
+        return None
+
 DEV_BOOST_WEIGHT = float(os.getenv("DEV_BOOST_WEIGHT", "0.5"))
 
 
-def rate_artist(artist_id, artist_name, verbose=False, force=False):
+def enrich_track(track, artist_name, album_name, verbose=False, spotify_match=None,
+                 lastfm_index=None, discogs_index=None):
+    """
+    Gather all per-track signals (Spotify, Last.fm, ListenBrainz/age score, genres)
+    for one Navidrome track. Independent of other tracks, so it is safe to run
+    from a worker thread. spotify_match is the pre-matched album track;
+    lastfm_index and discogs_index are the artist-level indexes, if available.
+    """
+    track_id   = track["id"]
+    title      = track["title"]
+    file_path  = track.get("path", "")
+    nav_genres = [track.get("genre")] if track.get("genre") else []
+    mbid       = track.get("mbid", None)
+    user_rating = track.get("userRating", 0)   # Subsonic omits userRating for unrated tracks
+
+    if verbose:
+        print(f"   🔍 Processing track: {title}")
+
+    # Spotify lookup + select (album match first, per-track search as fallback)
+    with stage_span("spotify_match"):
+        if spotify_match:
+            selected        = spotify_match
+        else:
+            spotify_results = search_spotify_track(title, artist_name, album_name)
+            selected        = select_best_spotify_match(spotify_results, title)
+    sp_score            = selected.get("popularity", 0)
+    spotify_album       = selected.get("album", {}).get("name", "")
+    spotify_artist      = selected.get("artists", [{}])[0].get("name", "")
+    spotify_genres      = selected.get("artists", [{}])[0].get("genres", [])
+    spotify_release_date= selected.get("album", {}).get("release_date", "")
+    images              = selected.get("album", {}).get("images") or []
+    spotify_album_art_url = images[0].get("url", "") if images and isinstance(images[0], dict) else ""
+    spotify_album_type  = (selected.get("album", {}).get("album_type", "") or "").lower()
+    spotify_total_tracks= selected.get("album", {}).get("total_tracks", 0)
+    is_spotify_single   = (spotify_album_type == "single")
+
+    # Last.fm (bulk artist index first, track.getInfo only for misses)
+    with stage_span("lastfm"):
+        lf_data        = lookup_lastfm_index(lastfm_index, title) or get_lastfm_track_info(artist_name, title)
+        lf_track_play  = lf_data.get("track_play", 0) if lf_data else 0
+        lf_artist_play = lf_data.get("artist_play", 0) if lf_data else 0
+        lf_ratio       = round((lf_track_play / lf_artist_play) * 100, 2) if lf_artist_play > 0 else 0
+
+    # Initial combined score
+    with stage_span("score"):
+        score, momentum, lb_score = compute_track_score(
+            title, artist_name, spotify_release_date or "1992-01-01", sp_score, mbid, verbose
+        )
+
+    # Genres from multiple sources
+    with stage_span("genres"):
+        discogs_genres  = discogs_index_genres(discogs_index, title) if discogs_index is not None \
+                          else get_discogs_genres(title, artist_name)
+        audiodb_genres  = get_audiodb_genres(artist_name) if (get_config()["features"].get("use_audiodb", False) and AUDIODB_API_KEY) else []
+        mb_genres       = get_musicbrainz_genres(title, artist_name)
+        lastfm_tags     = []  # populate if you fetch Last.fm tags elsewhere
+
+        online_top, _ = get_top_genres_with_navidrome(
+            {
+                "spotify":      spotify_genres,
+                "lastfm":       lastfm_tags,
+                "discogs":      discogs_genres,
+                "audiodb":      audiodb_genres,
+                "musicbrainz":  mb_genres,
+            },
+            nav_genres,
+            title=title,
+            album=album_name,
+        )
+        genre_context = "metal" if any("metal" in g.lower() for g in online_top) else ""
+        top_genres    = adjust_genres(online_top, artist_is_metal=(genre_context == "metal"))
+
+    return {
+        "id": track_id,
+        "title": title,
+        "album": album_name,
+        "artist": artist_name,
+
+        # combined score (updated after adaptive weighting)
+        "score": score,
+
+        # components for adaptive weighting
+        "spotify_score": sp_score,
+        "lastfm_ratio": lf_ratio,
+        "lastfm_score": lf_ratio,
+        "listenbrainz_score": lb_score,
+        "age_score": momentum,
+
+        # metadata & genres
+        "genres": top_genres,
+        "navidrome_genres": nav_genres,
+        "spotify_genres": spotify_genres,
+        "lastfm_tags": lastfm_tags,
+        "spotify_album": spotify_album,
+        "spotify_artist": spotify_artist,
+        "spotify_popularity": sp_score,
+        "spotify_release_date": spotify_release_date,
+        "spotify_album_art_url": spotify_album_art_url,
+        "lastfm_track_playcount": lf_track_play,
+        "lastfm_artist_playcount": lf_artist_play,
+        "file_path": file_path,
+        "user_rating": user_rating,
+        "last_scanned": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+
+        # single evidence (spotify)
+        "spotify_album_type": spotify_album_type,
+        "spotify_total_tracks": spotify_total_tracks,
+        "is_spotify_single": is_spotify_single,
+
+        # placeholders
+        "is_single": False,
+        "single_confidence": "low",
+        "single_sources": [],
+        "stars": 1,
+    }
+
+# --- Optional dependency (imported on first use) ---
+np = None
+HAVE_NUMPY = None   # unknown until have_numpy() is called
+
+def have_numpy():
+    global np, HAVE_NUMPY
+    if HAVE_NUMPY is None:
+        try:
+            import numpy as np
+            HAVE_NUMPY = True
+        except Exception:
+            HAVE_NUMPY = False
+    return HAVE_NUMPY
+
+# 📐 Scoring engine: columnar weighted scores + median/MAD banding for one album or many
+SCORE_SIGNALS = (
+    ("spotify",      "spotify_score"),
+    ("lastfm",       "lastfm_ratio"),
+    ("listenbrainz", "listenbrainz_score"),
+    ("age",          "age_score"),
+)
+STAR_BAND_EDGES = (-1.0, -0.3, 0.6)   # robust z: <-1 → 1★, <-0.3 → 2★, <0.6 → 3★, else 4★
+MAD_EPS = 1e-6
+
+def score_columns(tracks):
+    """Signal columns {signal: [values]} in track order (missing signals count as 0)."""
+    return {name: [t.get(key, 0) or 0 for t in tracks] for name, key in SCORE_SIGNALS}
+
+def _album_groups(n, album_ids):
+    if album_ids is None:
+        return [None], [0] * n
+    keys, index, groups = [], {}, []
+    for a in album_ids:
+        if a not in index:
+            index[a] = len(keys)
+            keys.append(a)
+        groups.append(index[a])
+    return keys, groups
+
+def compute_adaptive_weights(album_tracks, base_weights, clamp=(0.75, 1.25), use="mad"):
+    """
+    Scale each base weight by how much its signal spreads within the album compared with
+    the other signals, clamped to clamp. Spread is MAD (or population std with use="std")
+    over the column's largest magnitude, so signals on different scales compare.
+    """
+    from statistics import pstdev
+    fields = dict(SCORE_SIGNALS)
+    spreads = {}
+    for name in base_weights:
+        vals = [float(t.get(fields.get(name, name)) or 0.0) for t in album_tracks]
+        scale = max((abs(v) for v in vals), default=0.0)
+        if not scale:
+            spreads[name] = 0.0
+        elif use == "std":
+            spreads[name] = pstdev(vals) / scale
+        else:
+            med = median(vals)
+            spreads[name] = median([abs(v - med) for v in vals]) / scale
+    live = [v for v in spreads.values() if v > 0]
+    if not live:
+        return dict(base_weights)
+    avg = mean(live)
+    lo, hi = clamp
+    return {name: w * min(hi, max(lo, spreads[name] / avg)) for name, w in base_weights.items()}
+
+def album_score_weights(album_tracks, clamp):
+    """Per-album signal weights: adaptive Spotify/Last.fm/ListenBrainz plus the fixed age weight."""
+    base_weights = {
+        'spotify':      SPOTIFY_WEIGHT,
+        'lastfm':       LASTFM_WEIGHT,
+        'listenbrainz': LISTENBRAINZ_WEIGHT,
+    }
+    adaptive = compute_adaptive_weights(
+        album_tracks, base_weights=base_weights, clamp=clamp, use='mad'
+    )
+    return {**adaptive, 'age': AGE_WEIGHT}
+
+def weighted_scores(columns, weights, album_ids=None):
+    """
+    Weighted score per track. weights is one {signal: weight} dict, or
+    {album_id: {signal: weight}} together with album_ids (one per track).
+    """
+    n = len(columns["spotify"])
+    keys, groups = _album_groups(n, album_ids)
+    per_album = [weights] if album_ids is None else [weights[k] for k in keys]
+    names = [name for name, _ in SCORE_SIGNALS]
+    if n and have_numpy():
+        g = np.asarray(groups, dtype=np.int64)
+        total = None
+        for name in names:   # same left-to-right summation order as the scalar path
+            w = np.asarray([aw.get(name, 0.0) for aw in per_album], dtype=float)[g]
+            term = w * np.asarray(columns[name], dtype=float)
+            total = term if total is None else total + term
+        return total.tolist()
+    out = []
+    for i in range(n):
+        aw = per_album[groups[i]]
+        total = None
+        for name in names:
+            term = aw.get(name, 0.0) * columns[name][i]
+            total = term if total is None else total + term
+        out.append(total)
+    return out
+
+def _band_album_python(scores, singles, cap_top4_pct):
+    order  = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    clamp  = [max(0.0, float(scores[i])) for i in order]
+    med    = median(clamp)
+    mad    = max(median([abs(v - med) for v in clamp]), MAD_EPS)
+    stars  = [0] * len(scores)
+    top4, non_singles = [], 0
+    for i, v in zip(order, clamp):
+        if singles[i]:
+            stars[i] = 5
+            continue
+        non_singles += 1
+        z = (v - med) / mad
+        stars[i] = 1 + sum(1 for edge in STAR_BAND_EDGES if z >= edge)
+        if stars[i] == 4:
+            top4.append(i)       # already in descending z order
+    max_top4 = max(1, round(non_singles * cap_top4_pct))
+    for i in top4[max_top4:]:
+        stars[i] = 3
+    return stars, med, mad
+
+def _band_scores_numpy(scores, singles, groups, n_groups, cap_top4_pct):
+    raw   = np.asarray(scores, dtype=float)
+    g     = np.asarray(groups, dtype=np.int64)
+    idx   = np.arange(len(raw))
+    order = np.lexsort((idx, -raw, g))          # per album: score desc, ties in track order
+    gs    = g[order]
+    vals  = np.maximum(0.0, raw[order])
+    counts = np.bincount(gs, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    def group_median(v):
+        sv = v[np.lexsort((v, gs))]
+        return (sv[starts + (counts - 1) // 2] + sv[starts + counts // 2]) / 2
+
+    med = group_median(vals)
+    mad = np.maximum(group_median(np.abs(vals - med[gs])), MAD_EPS)
+    z   = (vals - med[gs]) / mad[gs]
+
+    stars   = np.digitize(z, STAR_BAND_EDGES) + 1
+    single  = np.asarray(singles, dtype=bool)[order]
+    top4    = ~single & (stars == 4)
+    before  = np.cumsum(top4) - top4            # top4 tracks ahead of this one overall
+    rank    = before - before[starts][gs]       # ...and within its own album
+    max_top4 = np.maximum(1, np.rint(np.bincount(gs, weights=(~single).astype(float), minlength=n_groups) * cap_top4_pct))
+    stars[top4 & (rank >= max_top4[gs])] = 3
+    stars[single] = 5
+
+    out = np.empty_like(stars)
+    out[order] = stars
+    return out.tolist(), med.tolist(), mad.tolist()
+
+def band_scores(scores, singles, album_ids=None, cap_top4_pct=0.25):
+    """
+    Stars for tracks of one album (album_ids=None) or a whole library in one pass.
+    Singles get 5★; non-singles are spread into 1★–4★ by robust z-score against
+    their album's median/MAD, with 4★ capped at cap_top4_pct of the non-singles.
+
+    Returns (stars in input order, {album_id: (median, mad)}).
+    """
+    keys, groups = _album_groups(len(scores), album_ids)
+    if not scores:
+        return [], {}
+    if have_numpy():
+        stars, meds, mads = _band_scores_numpy(scores, singles, groups, len(keys), cap_top4_pct)
+        return stars, {k: (meds[i], mads[i]) for i, k in enumerate(keys)}
+
+    members = [[] for _ in keys]
+    for i, gi in enumerate(groups):
+        members[gi].append(i)
+    stars, stats = [0] * len(scores), {}
+    for gi, k in enumerate(keys):
+        rows = members[gi]
+        album_stars, med, mad = _band_album_python([scores[i] for i in rows],
+                                                   [singles[i] for i in rows], cap_top4_pct)
+        for i, st in zip(rows, album_stars):
+            stars[i] = st
+        stats[k] = (med, mad)
+    return stars, stats
+
+def rate_artist(artist_id, artist_name, verbose=False, force=False, workers=1, incremental=False,
+                skip_albums=None):
+    """Rate one artist (see _rate_artist) with per-stage timings; under cProfile with --profile."""
+    timings = {}
+    start = time.perf_counter()
+    with profile_artist(artist_name), stage_collector(timings):
+        rated = _rate_artist(artist_id, artist_name, verbose, force, workers, incremental,
+                             skip_albums, timings)
+    print(f"⏱️ Stages for {artist_name}: {format_stage_timings(timings, time.perf_counter() - start)}")
+    return rated
+
+def _rate_artist(artist_id, artist_name, verbose=False, force=False, workers=1, incremental=False,
+                 skip_albums=None, stage_timings=None):
     """
     Rate all tracks for a given artist:
       - Enrich per-track metadata (Spotify, Last.fm, ListenBrainz, Age, Genres)
@@ -554,163 +2560,160 @@ def rate_artist(artist_id, artist_name, verbose=False, force=False):
       - Cap density of 4★ among non-singles to keep albums realistic
       - Save to DB; optionally push ratings to Navidrome (respecting sync/dry_run)
       - Build 5★ list for "Essential {artist}" playlist creation
+      - incremental=True skips albums whose fingerprint is unchanged and that were
+        enriched or re-scored within ALBUM_STALE_DAYS; older unchanged ones are
+        re-scored from stored signals without provider calls, and re-enriched once
+        their signals pass ALBUM_SIGNAL_MAX_DAYS
+      - skip_albums: {album_id: journaled ratings} completed by an interrupted run (--resume)
+      - stage_timings: the artist's stage collector, diffed per album for verbose breakdowns
 
     Returns:
       dict of track_id -> track_data
     """
 
     # ---- Tunables (config-driven with sensible defaults) --------------------
-    CLAMP_MIN     = config.get("features", {}).get("clamp_min", 0.75)
-    CLAMP_MAX     = config.get("features", {}).get("clamp_max", 1.25)
-    CAP_TOP4_PCT  = config.get("features", {}).get("cap_top4_pct", 0.25)   # 25% cap
-    KNOWN_SINGLES = config.get("features", {}).get("known_singles", {}).get(artist_name, [])
+    features      = get_config()["features"]
+    CLAMP_MIN     = features.get("clamp_min", 0.75)
+    CLAMP_MAX     = features.get("clamp_max", 1.25)
+    CAP_TOP4_PCT  = features.get("cap_top4_pct", 0.25)   # 25% cap
+    KNOWN_SINGLES = (features.get("known_singles") or {}).get(artist_name, [])
 
     # ---- Fetch albums -------------------------------------------------------
-    albums = fetch_artist_albums(artist_id)
+    if stage_timings is None:
+        stage_timings = {}
+    with stage_span("album_fetch"):
+        albums = fetch_artist_albums(artist_id)
     if not albums:
         print(f"⚠️ No albums found for artist '{artist_name}'")
         return {}
 
     print(f"\n🎨 Starting rating for artist: {artist_name} ({len(albums)} albums)")
+    metrics_start = metrics_snapshot()
     rated_map = {}
     all_five_star_tracks = []
+    # Provider indexes are only needed to enrich; skipped/re-scored albums never touch them
+    indexes_built = False
+
+    # Worker pool for network-bound per-track lookups; results keep track order
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sptnr-enrich") if workers > 1 else None
 
     for album in albums:
         album_name = album.get("name", "Unknown Album")
         album_id   = album.get("id")
-        tracks     = fetch_album_tracks(album_id)
+        album_start, album_timings_before = time.perf_counter(), dict(stage_timings)
+        with stage_span("album_fetch"):
+            tracks = fetch_album_tracks(album_id)
         if not tracks:
             print(f"⚠️ No tracks found in album '{album_name}'")
             continue
 
-        print(f"\n🎧 Scanning album: {album_name} ({len(tracks)} tracks)")
-        album_tracks = []
-
-        # ---- Per-track enrichment ------------------------------------------
-        for track in tracks:
-            track_id   = track["id"]
-            title      = track["title"]
-            file_path  = track.get("path", "")
-            nav_genres = [track.get("genre")] if track.get("genre") else []
-            mbid       = track.get("mbid", None)
+        resumed   = bool(skip_albums) and album_id in skip_albums
+        mode      = album_scan_mode(album_id, album, tracks) if incremental and not force and not resumed \
+                    else "enrich"
+        stored    = load_track_signals(album_id=album_id) if mode == "rescore" else None
+        if stored is not None and {t["id"] for t in stored} != {t["id"] for t in tracks}:
+            mode = "enrich"      # signals missing for some tracks (e.g. scanned before they were stored)
+        unchanged = mode == "skip"
+        if resumed or unchanged:
+            if resumed:
+                # Ratings from before the interruption still need to reach a later sync
+                print(f"⏩ Already completed before interruption: {album_name}")
+                for trk in skip_albums[album_id]:
+                    rated_map[trk["id"]] = trk
+            else:
+                print(f"⏭️ Unchanged album: {album_name} ({len(tracks)} tracks)")
+                journal_append("album_done", artist=artist_name, album_id=album_id,
+                               album=album_name, outcome="unchanged", tracks=len(tracks))
+            cached = load_rating_cache(t["id"] for t in tracks)
+            all_five_star_tracks.extend(tid for tid, e in cached.items() if e.get("stars") == 5)
+            continue
 
-            if verbose:
-                print(f"   🔍 Processing track: {title}")
-
-            # Spotify lookup + select
-            spotify_results     = search_spotify_track(title, artist_name, album_name)
-            selected            = select_best_spotify_match(spotify_results, title)
-            sp_score            = selected.get("popularity", 0)
-            spotify_album       = selected.get("album", {}).get("name", "")
-            spotify_artist      = selected.get("artists", [{}])[0].get("name", "")
-            spotify_genres      = selected.get("artists", [{}])[0].get("genres", [])
-            spotify_release_date= selected.get("album", {}).get("release_date", "")
-            images              = selected.get("album", {}).get("images") or []
-            spotify_album_art_url = images[0].get("url", "") if images and isinstance(images[0], dict) else ""
-            spotify_album_type  = (selected.get("album", {}).get("album_type", "") or "").lower()
-            spotify_total_tracks= selected.get("album", {}).get("total_tracks", 0)
-            is_spotify_single   = (spotify_album_type == "single")
-
-            # Last.fm
-            lf_data        = get_lastfm_track_info(artist_name, title)
-            lf_track_play  = lf_data.get("track_play", 0) if lf_data else 0
-            lf_artist_play = lf_data.get("artist_play", 0) if lf_data else 0
-            lf_ratio       = round((lf_track_play / lf_artist_play) * 100, 2) if lf_artist_play > 0 else 0
-
-            # Initial combined score
-            score, momentum, lb_score = compute_track_score(
-                title, artist_name, spotify_release_date or "1992-01-01", sp_score, mbid, verbose
-            )
+        if mode == "rescore":
+            # Stale but unchanged: re-band the stored signals with current weights, no provider calls
+            with stage_span("scoring"):
+                scores, stars = score_stored_signals(stored, (CLAMP_MIN, CLAMP_MAX), CAP_TOP4_PCT)
+            user_ratings = {t["id"]: t.get("userRating", 0) for t in tracks}
+            changed = 0
+            for trk, score, new_stars in zip(stored, scores, stars):
+                changed += new_stars != trk["stars"]
+                trk.update(score=max(0.0, float(score)), stars=new_stars, user_rating=user_ratings.get(trk["id"], 0))
+                rated_map[trk["id"]] = trk
+                if new_stars == 5:
+                    all_five_star_tracks.append(trk["id"])
+            with stage_span("persist"):
+                save_rating_cache({t["id"]: build_cache_entry(t["stars"], t["score"], artist_name) for t in stored})
+                save_track_signals(album_id, stored)
+                mark_album_rescored(album_id)
+                journal_append("album_done", artist=artist_name, album_id=album_id,
+                               album=album_name, outcome="rescored", tracks=len(stored),
+                               ratings=[{"id": t["id"], "title": t["title"], "stars": t["stars"],
+                                         "score": t["score"], "user_rating": t["user_rating"]}
+                                        for t in stored])
+            print(f"♻️ Re-scored from stored signals: {album_name} ({len(stored)} tracks, {changed} changed)")
+            continue
 
-            # Genres from multiple sources
-            discogs_genres  = get_discogs_genres(title, artist_name)
-            audiodb_genres  = get_audiodb_genres(artist_name) if (config["features"].get("use_audiodb", False) and AUDIODB_API_KEY) else []
-            mb_genres       = get_musicbrainz_genres(title, artist_name)
-            lastfm_tags     = []  # populate if you fetch Last.fm tags elsewhere
-
-            online_top, _ = get_top_genres_with_navidrome(
-                {
-                    "spotify":      spotify_genres,
-                    "lastfm":       lastfm_tags,
-                    "discogs":      discogs_genres,
-                    "audiodb":      audiodb_genres,
-                    "musicbrainz":  mb_genres,
-                },
-                nav_genres,
-                title=title,
-                album=album_name,
-            )
-            genre_context = "metal" if any("metal" in g.lower() for g in online_top) else ""
-            top_genres    = adjust_genres(online_top, artist_is_metal=(genre_context == "metal"))
-
-            album_tracks.append({
-                "id": track_id,
-                "title": title,
-                "album": album_name,
-                "artist": artist_name,
-
-                # combined score (updated after adaptive weighting)
-                "score": score,
-
-                # components for adaptive weighting
-                "spotify_score": sp_score,
-                "lastfm_ratio": lf_ratio,
-                "lastfm_score": lf_ratio,
-                "listenbrainz_score": lb_score,
-                "age_score": momentum,
-
-                # metadata & genres
-                "genres": top_genres,
-                "navidrome_genres": nav_genres,
-                "spotify_genres": spotify_genres,
-                "lastfm_tags": lastfm_tags,
-                "spotify_album": spotify_album,
-                "spotify_artist": spotify_artist,
-                "spotify_popularity": sp_score,
-                "spotify_release_date": spotify_release_date,
-                "spotify_album_art_url": spotify_album_art_url,
-                "lastfm_track_playcount": lf_track_play,
-                "lastfm_artist_playcount": lf_artist_play,
-                "file_path": file_path,
-                "last_scanned": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-
-                # single evidence (spotify)
-                "spotify_album_type": spotify_album_type,
-                "spotify_total_tracks": spotify_total_tracks,
-                "is_spotify_single": is_spotify_single,
-
-                # placeholders
-                "is_single": False,
-                "single_confidence": "low",
-                "single_sources": [],
-                "stars": 1,
-            })
+        print(f"\n🎧 Scanning album: {album_name} ({len(tracks)} tracks)")
+        if not indexes_built:
+            with stage_span("artist_index"):
+                single_cache = load_single_cache(artist_name)
+                lastfm_index = build_lastfm_artist_index(artist_name)
+                mb_index     = build_musicbrainz_artist_index(artist_name, force=force)
+                discogs_index = build_discogs_artist_index(artist_name, DISCOGS_TOKEN, force=force)
+            indexes_built = True
+
+        # ---- Spotify album match (one album + batched tracks lookup) --------
+        with stage_span("spotify_match"):
+            spotify_matches = match_spotify_album_tracks(tracks, album_name, artist_name)
+        if verbose and spotify_matches:
+            print(f"   💿 Spotify album match: {len(spotify_matches)}/{len(tracks)} tracks")
+
+        # ---- Per-track enrichment (optionally fanned out over threads) -----
+        def enrich(t):
+            return enrich_track(t, artist_name, album_name, verbose,
+                                spotify_matches.get(t["id"]), lastfm_index, discogs_index)
+
+        if pool is not None:
+            album_tracks = list(pool.map(bind_stage_collectors(enrich), tracks))
+        else:
+            album_tracks = [enrich(t) for t in tracks]
 
         # ---- Adaptive weights per album & recompute score -------------------
-        base_weights = {
-            'spotify':      SPOTIFY_WEIGHT,
-            'lastfm':       LASTFM_WEIGHT,
-            'listenbrainz': LISTENBRAINZ_WEIGHT,
-        }
-        adaptive = compute_adaptive_weights(
-            album_tracks, base_weights=base_weights, clamp=(CLAMP_MIN, CLAMP_MAX), use='mad'
-        )
-
-        for t in album_tracks:
-            sp  = t.get('spotify_score', 0)
-            lf  = t.get('lastfm_ratio', 0)
-            lb  = t.get('listenbrainz_score', 0)
-            age = t.get('age_score', 0)
-            t['score'] = (adaptive['spotify'] * sp) + \
-                         (adaptive['lastfm'] * lf) + \
-                         (adaptive['listenbrainz'] * lb) + \
-                         (AGE_WEIGHT * age)
+        with stage_span("scoring"):
+            album_scores = weighted_scores(score_columns(album_tracks),
+                                           album_score_weights(album_tracks, (CLAMP_MIN, CLAMP_MAX)))
+        for t, score in zip(album_tracks, album_scores):
+            t['score'] = score
 
         # ---- High-confidence singles detection (multi-source + Spotify) -----
         youtube_key   = YOUTUBE_API_KEY     # from your config earlier
         discogs_token = DISCOGS_TOKEN       # from your config earlier
 
-        for trk in album_tracks:
+        # multi-source aggregator (Discogs/MusicBrainz/YouTube/Last.fm + known_singles)
+        def aggregate(trk):
+            return detect_single_status(
+                trk["title"], artist_name,
+                cache=single_cache,      # persisted verdicts, refreshed per confidence TTL
+                force=force,
+                youtube_api_key=youtube_key,
+                discogs_token=discogs_token,
+                known_list=KNOWN_SINGLES,
+                use_lastfm=True,         # set False if you prefer to avoid the bs4 heuristic
+                mb_index=mb_index,       # local release-group lookup instead of one search per track
+                discogs_index=discogs_index
+            )
+
+        cached_before = dict(single_cache)
+        with stage_span("singles"):
+            if pool is not None:
+                aggregates = list(pool.map(bind_stage_collectors(aggregate), album_tracks))
+            else:
+                aggregates = [aggregate(trk) for trk in album_tracks]
+        fresh_verdicts = {k: v for k, v in single_cache.items() if cached_before.get(k) is not v}
+        if fresh_verdicts:
+            with stage_span("persist"):
+                save_single_cache(fresh_verdicts)
+
+        for trk, agg in zip(album_tracks, aggregates):
             title      = trk["title"]
             canonical  = is_valid_version(title, allow_live_remix=False)
 
@@ -718,17 +2721,6 @@ def rate_artist(artist_id, artist_name, verbose=False, force=False):
             spotify_source       = bool(trk.get("is_spotify_single"))
             short_release_source = (trk.get("spotify_total_tracks", 99) <= 2)
 
-            # multi-source aggregator (Discogs/MusicBrainz/YouTube/Last.fm + known_singles)
-            agg = detect_single_status(
-                title, artist_name,
-                cache={},                # use ephemeral cache here; DB persists later
-                force=force,
-                youtube_api_key=youtube_key,
-                discogs_token=discogs_token,
-                known_list=KNOWN_SINGLES,
-                use_lastfm=True          # set False if you prefer to avoid the bs4 heuristic
-            )
-
             trk["single_sources"] = []
             if spotify_source:       trk["single_sources"].append("spotify")
             if short_release_source: trk["single_sources"].append("short_release")
@@ -756,72 +2748,32 @@ def rate_artist(artist_id, artist_name, verbose=False, force=False):
                     f"   🔎 Single check: {title} | canonical={canonical} | "
                     f"spotify_single={spotify_source} | short_release={short_release_source} | "
                     f"agg_sources={','.join(agg.get('sources', [])) or '-'} | "
+                    f"skipped={','.join(agg.get('skipped', [])) or '-'} | "
                     f"confidence={trk['single_confidence']} | decision={decision}"
                 )
 
-        # ---- Sort by score & normalize WITHOUT random bump ------------------
-        sorted_album = sorted(album_tracks, key=lambda x: x["score"], reverse=True)
-        for trk in sorted_album:
+        # ---- Sort by score; singles 5★, non-singles Median/MAD banded 1★–4★ with 4★ cap
+        with stage_span("scoring"):
+            sorted_album = sorted(album_tracks, key=lambda x: x["score"], reverse=True)
+            album_stars, album_stats = band_scores(
+                [t["score"] for t in sorted_album],
+                [bool(t.get("is_single")) for t in sorted_album],
+                cap_top4_pct=CAP_TOP4_PCT
+            )
+        for trk, stars in zip(sorted_album, album_stars):
             trk["score"] = max(0.0, float(trk["score"]))  # keep float for MAD
-
-        # ---- Median/MAD spreading for NON‑SINGLES (1★–4★ only) -------------
-        EPS         = 1e-6
-        scores_all  = [t["score"] for t in sorted_album]
-        med         = median(scores_all)
-
-        def mad(vals):
-            m = median(vals)
-            return median([abs(v - m) for v in vals])
-
-        mad_val = max(mad(scores_all), EPS)
-
-        def zrobust(x, m=med, s=mad_val):
-            return (x - m) / s
-
+            trk["stars"] = stars
+        med, mad_val = album_stats[None]
         non_single_tracks = [t for t in sorted_album if not t.get("is_single")]
-        BANDS = [
-            (-float("inf"), -1.0, 1),   # far below median -> 1★
-            (-1.0,          -0.3, 2),   # below median     -> 2★
-            (-0.3,           0.6, 3),   # around median    -> 3★
-            (0.6,  float("inf"), 4),    # above median     -> 4★
-        ]
-
-        z_list = []
-        for t in non_single_tracks:
-            z = zrobust(t["score"])
-            z_list.append((t, z))
-            for lo, hi, stars in BANDS:
-                if lo <= z < hi:
-                    t["stars"] = stars
-                    break
-
-        # Cap 4★ density among non‑singles (configurable)
-        top4      = [t for (t, z) in z_list if t.get("stars") == 4]
-        max_top4  = max(1, round(len(non_single_tracks) * CAP_TOP4_PCT))
-        if len(top4) > max_top4:
-            top4_sorted = sorted(
-                [(t, zrobust(t["score"])) for t in top4],
-                key=lambda x: x[1], reverse=True
-            )
-            for t, _ in top4_sorted[max_top4:]:
-                t["stars"] = 3
 
         # ---- Finalize, persist, and print prior → new comparison -----------
         single_count      = sum(1 for trk in sorted_album if trk.get("is_single"))
         non_single_fours  = sum(1 for t in non_single_tracks if t.get("stars") == 4)
 
         for trk in sorted_album:
-            prior_stars = get_current_rating(trk["id"])
-
-            # Save to DB
-            save_to_db(trk)
-
-            # Set rating only when allowed
-            if sync and not dry_run:
-                set_track_rating(trk["id"], trk["stars"])
-                action_prefix = "✅ Navidrome rating updated:"
-            else:
-                action_prefix = "🧪 DRY-RUN (no push):"
+            # Current Navidrome rating comes with the album payload; pushing is left to the sync stage
+            prior_stars   = trk.get("user_rating")
+            action_prefix = "🎚️ Rated:"
 
             # Show single confirmation source inline
             is_single = trk.get("is_single")
@@ -853,81 +2805,196 @@ def rate_artist(artist_id, artist_name, verbose=False, force=False):
         # Record in rated_map
         for trk in sorted_album:
             rated_map[trk["id"]] = trk
+        with stage_span("persist"):
+            # every rating lands in the ratings table; only the Navidrome push is diff-gated (sync)
+            save_rating_cache({t["id"]: build_cache_entry(t["stars"], t["score"], artist_name)
+                               for t in sorted_album})
+            save_album_state(album_id, artist_name, album, tracks)
+            save_track_signals(album_id, album_tracks)
+            journal_append("album_done", artist=artist_name, album_id=album_id,
+                           album=album_name, outcome="rated", tracks=len(sorted_album),
+                           ratings=[{"id": t["id"], "title": t["title"], "stars": t["stars"],
+                                     "score": t["score"], "user_rating": t.get("user_rating")}
+                                    for t in sorted_album])
+        if verbose:
+            album_timings = {k: v - album_timings_before.get(k, 0.0) for k, v in stage_timings.items()}
+            print(f"   ⏱️ Album stages: {format_stage_timings(album_timings, time.perf_counter() - album_start)}")
+
+    if pool is not None:
+        pool.shutdown(wait=True)
 
     # ---- Essential playlist (post-artist) ----------------------------------
     all_five_star_tracks = list(dict.fromkeys(all_five_star_tracks))  # dedupe
     if artist_name.lower() != "various artists" and len(all_five_star_tracks) >= 10 and sync and not dry_run:
         playlist_name = f"Essential {artist_name}"
-        create_playlist(playlist_name, all_five_star_tracks)
+        with stage_span("playlist"):
+            create_playlist(playlist_name, all_five_star_tracks)
         print(f"🎶 Essential playlist created: {playlist_name} with {len(all_five_star_tracks)} tracks")
     else:
         print(f"ℹ️ No Essential playlist created for {artist_name} (5★ tracks: {len(all_five_star_tracks)})")
 
+    if verbose:
+        print_rate_limiter_state()
+    print_metrics_summary(since=metrics_start, label=artist_name, compact=True)
+
     print(f"✅ Finished rating for artist: {artist_name}")
     return rated_map
 
 def fetch_all_artists():
     try:
-        with open(INDEX_FILE) as f:
-            artist_map = json.load(f)
-        return list(artist_map.keys())
+        return list(load_artist_index().keys())
     except Exception as e:
         print(f"\n❌ Failed to fetch cached artist list: {type(e).__name__} - {e}")
         sys.exit(1)
 
-import difflib
-
-def sync_to_navidrome(track_ratings, artist_name):
-    nav_base, auth = get_auth_params()
-    if not nav_base or not auth:
-        return
-
-    cache = load_rating_cache()
-    updated_cache = cache.copy()
-    matched = 0
-    changed = 0
+NAV_SYNC_WORKERS = int(os.getenv("NAV_SYNC_WORKERS", "4"))
 
+def plan_rating_sync(track_ratings):
+    """
+    Tracks whose computed stars differ from Navidrome's current rating. The rating
+    read from the album payload (user_rating) is authoritative; tracks without it
+    (rescored or resumed) are compared against the rating cache instead.
+    Returns (changes, unchanged).
+    """
+    missing = [t["id"] for t in track_ratings if t.get("id") and t.get("user_rating") is None]
+    cache = load_rating_cache(missing) if missing else {}
+    record_cache("rating", True, len(cache))
+    record_cache("rating", False, len(set(missing)) - len(cache))
+    changes, unchanged = [], []
     for track in track_ratings:
-        title = track["title"]
-        stars = track.get("stars", 0)
-        score = track.get("score")
-        track_id = track.get("id")
-
-        if not track_id:
-            print(f"{LIGHT_RED}❌ Missing ID for: '{title}', skipping sync.{RESET}")
+        if not track.get("id"):
+            print(f"{LIGHT_RED}❌ Missing ID for: '{track.get('title')}', skipping sync.{RESET}")
             continue
+        current = track.get("user_rating")
+        if current is None:
+            current = cache.get(track["id"], {}).get("stars", 0)
+        (unchanged if current == track.get("stars", 0) else changes).append(track)
+    return changes, unchanged
+
+def push_ratings(changes, workers=NAV_SYNC_WORKERS):
+    """Send setRating for each change over the pooled Navidrome session; returns the pushed tracks."""
+    nav_base, auth = get_auth_params()
+    if not nav_base or not auth or not changes:
+        return []
 
-        last_rating_entry = cache.get(track_id, {})
-        cached_stars = last_rating_entry.get("stars", 0)
-
-        print(f"🧪 Sync check → {title} | current stars: {stars} | cached: {cached_stars}")
+    def push(track):
+        res = http_get("navidrome", f"{nav_base}/rest/setRating.view",
+                       params={**auth, "id": track["id"], "rating": track.get("stars", 0)})
+        res.raise_for_status()
+        return track
 
-        if cached_stars == stars:
-            print(f"{LIGHT_BLUE}⏩ No change: '{title}' (stars: {'★' * stars}){RESET}")
-            matched += 1
-            continue
+    pushed = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sptnr-sync") as pool:
+        futures = {pool.submit(push, t): t for t in changes}
+        for fut in as_completed(futures):
+            track = futures[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"{LIGHT_RED}⚠️ Sync failed for '{track['title']}': {type(e).__name__} - {e}{RESET}")
+                continue
+            print(f"{LIGHT_GREEN}✅ Synced: {track['title']} (stars: {'★' * track.get('stars', 0)}){RESET}")
+            pushed.append(track)
+    return pushed
 
-        try:
-            set_params = {**auth, "id": track_id, "rating": stars}
-            set_res = requests.get(f"{nav_base}/rest/setRating.view", params=set_params)
-            set_res.raise_for_status()
+def sync_to_navidrome(track_ratings, artist_name):
+    """Push only changed ratings (concurrently), then write the rating cache once."""
+    nav_base, _ = get_auth_params()
+    if not nav_base:
+        return
+    changes, unchanged = plan_rating_sync(track_ratings)
+    start = time.perf_counter()
+    with stage_span("navidrome_push"):
+        pushed = push_ratings(changes)
+
+    # Unchanged tracks are refreshed too, so the cache mirrors Navidrome for later cache-based diffs
+    save_rating_cache({t["id"]: build_cache_entry(t.get("stars", 0), t.get("score"), artist_name)
+                       for t in pushed + unchanged})
+    print(f"\n📊 Sync summary: {len(pushed)} updated, {len(unchanged)} unchanged, "
+          f"{len(changes) - len(pushed)} failed, {len(track_ratings)} total rated "
+          f"({time.perf_counter() - start:.2f}s)")
 
-            print(f"{LIGHT_GREEN}✅ Synced: {title} (stars: {'★' * stars}){RESET}")
+    
+def print_rescore_diff(before, after):
+    """Star distribution before → after, in the style of print_rating_summary."""
+    counts_before = {s: 0 for s in range(1, 6)}
+    counts_after  = {s: 0 for s in range(1, 6)}
+    for s in before:
+        counts_before[s] = counts_before.get(s, 0) + 1
+    for s in after:
+        counts_after[s] = counts_after.get(s, 0) + 1
+
+    print(f"\n📈 Star Distribution (before → after):")
+    for s in range(5, 0, -1):
+        delta = counts_after[s] - counts_before[s]
+        print(f"{'★' * s:<5} : {counts_before[s]:>6} → {counts_after[s]:>6}  ({delta:+d})")
+
+    changed = sum(1 for b, a in zip(before, after) if b != a)
+    print(f"\n🔁 {changed} of {len(after)} track{'s' if len(after) != 1 else ''} change rating")
+
+
+def score_stored_signals(tracks, clamp, cap_top4_pct):
+    """(scores, stars) for stored signal rows of one or many albums, with the current weights."""
+    albums = {}
+    for t in tracks:
+        albums.setdefault(t["album_id"], []).append(t)
+    weights   = {album_id: album_score_weights(album_tracks, clamp)
+                 for album_id, album_tracks in albums.items()}
+    album_ids = [t["album_id"] for t in tracks]
+    scores    = weighted_scores(score_columns(tracks), weights, album_ids=album_ids)
+    stars, _  = band_scores(scores, [t["is_single"] for t in tracks],
+                            album_ids=album_ids, cap_top4_pct=cap_top4_pct)
+    return scores, stars
+
+def rescore_library(artists=None, sync=False, dry_run=False):
+    """
+    Recompute stars from stored per-track signals with the current weights,
+    clamp and 4★ cap — no provider calls. Singles keep their stored verdict.
+    Changed ratings are written back to the signal store and, with sync, pushed
+    to Navidrome (only the changed ones).
+    """
+    features     = get_config()["features"]
+    clamp        = (features.get("clamp_min", 0.75), features.get("clamp_max", 1.25))
+    cap_top4_pct = features.get("cap_top4_pct", 0.25)
 
-            updated_cache[track_id] = build_cache_entry(stars, score)
-            matched += 1
-            changed += 1
-        except Exception as e:
-            print(f"{LIGHT_RED}⚠️ Sync failed for '{title}': {type(e).__name__} - {e}{RESET}")
+    tracks = load_track_signals(artists)
+    if not tracks:
+        print(f"{LIGHT_RED}⚠️ No stored signals found — run a scan first.{RESET}")
+        return {}
+    print(f"🧮 Re-scoring {len(tracks)} tracks from stored signals...")
+
+    albums = {}
+    for t in tracks:
+        albums.setdefault(t["album_id"], []).append(t)
+    scores, stars = score_stored_signals(tracks, clamp, cap_top4_pct)
+
+    before  = [t["stars"] for t in tracks]
+    changed = []
+    for t, score, new_stars in zip(tracks, scores, stars):
+        t["score"] = max(0.0, float(score))
+        if new_stars != t["stars"]:
+            t["stars"] = new_stars
+            changed.append(t)
+    print_rescore_diff(before, stars)
+
+    if dry_run:
+        print("🧪 DRY-RUN: nothing saved or pushed.")
+        return {t["id"]: t for t in changed}
+
+    for album_id in {t["album_id"] for t in changed}:
+        save_track_signals(album_id, albums[album_id])
+    if sync and changed:
+        by_artist = {}
+        for t in changed:
+            by_artist.setdefault(t["artist"], []).append(t)
+        for artist_name, artist_tracks in by_artist.items():
+            sync_to_navidrome(artist_tracks, artist_name)
+    return {t["id"]: t for t in changed}
 
-    save_rating_cache(updated_cache)
-    print(f"\n📊 Sync summary: {changed} updated, {matched} total checked, {len(track_ratings)} total rated")
 
-    
 def pipe_output(search_term=None):
     try:
-        with open(INDEX_FILE) as f:
-            artist_map = json.load(f)
+        artist_map = load_artist_index()
         filtered = {
             name: aid for name, aid in artist_map.items()
             if not search_term or search_term.lower() in name.lower()
@@ -937,18 +3004,378 @@ def pipe_output(search_term=None):
             print(f"🎨 {name} → ID: {aid}")
         sys.exit(0)
     except Exception as e:
-        print(f"⚠️ Failed to read {INDEX_FILE}: {type(e).__name__} - {e}")
+        print(f"⚠️ Failed to read artist index from {CACHE_DB_FILE}: {type(e).__name__} - {e}")
         sys.exit(1)
         
-def batch_rate(sync=False, dry_run=False, force=False, resume_from=None):
-    print(f"\n🔧 Batch config → sync: {sync}, dry_run: {dry_run}, force: {force}")
+# 🤝 Multi-worker coordination: shared SQLite work queue with leases + global rate budgets
+QUEUE_DB_FILE = os.getenv("SPTNR_QUEUE_DB", os.path.join(DATA_DIR, "sptnr_queue.db"))
+QUEUE_LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "900"))
+QUEUE_HEARTBEAT_SECONDS = int(os.getenv("QUEUE_HEARTBEAT_SECONDS", "60"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def queue_worker_id():
+    """Queue identity of the calling thread: --artist-workers threads in one process each hold their own leases."""
+    return f"{WORKER_ID}-{threading.get_ident()}"
+GLOBAL_RATE_BUDGETS = False   # enabled by enable_global_rate_budgets() in queue workers
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_queue (
+    artist        TEXT PRIMARY KEY,
+    artist_id     TEXT,
+    status        TEXT DEFAULT 'pending',
+    worker        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER DEFAULT 0,
+    updated       REAL,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_work_queue_status ON work_queue(status, lease_expires);
+
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id      TEXT PRIMARY KEY,
+    started        REAL,
+    heartbeat      REAL,
+    current_artist TEXT,
+    done_count     INTEGER DEFAULT 0,
+    failed_count   INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS rate_budget (
+    provider  TEXT PRIMARY KEY,
+    next_slot REAL
+);
+"""
+
+_queue_db_local = threading.local()
+
+def get_queue_db():
+    """Per-thread autocommit connection to the coordinator DB; writers use BEGIN IMMEDIATE."""
+    conn = getattr(_queue_db_local, "conn", None)
+    if conn is None:
+        ensure_parent_dir(QUEUE_DB_FILE)
+        conn = sqlite3.connect(QUEUE_DB_FILE, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(QUEUE_SCHEMA)
+        _queue_db_local.conn = conn
+    return conn
+
+def _queue_write(fn):
+    """Run fn(conn) inside one immediate (write-locked) transaction."""
+    conn = get_queue_db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn(conn)
+        conn.execute("COMMIT")
+        return result
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def enable_global_rate_budgets():
+    global GLOBAL_RATE_BUDGETS
+    get_queue_db()
+    GLOBAL_RATE_BUDGETS = True
+
+def reserve_global_slot(provider, rate):
+    """Reserve the next request slot for a provider across all workers; returns seconds to wait."""
+    def reserve(conn):
+        now = time.time()
+        row = conn.execute("SELECT next_slot FROM rate_budget WHERE provider = ?", (provider,)).fetchone()
+        slot = max(now, row[0] if row else now)
+        conn.execute("INSERT OR REPLACE INTO rate_budget (provider, next_slot) VALUES (?, ?)",
+                     (provider, slot + 1.0 / max(rate, 0.01)))
+        return slot - now
+    try:
+        return _queue_write(reserve)
+    except sqlite3.Error:
+        return 0.0
+
+def push_global_backoff(provider, delay):
+    """A 429 seen by one worker pauses the provider for every worker."""
+    def push(conn):
+        until = time.time() + delay
+        conn.execute("INSERT INTO rate_budget (provider, next_slot) VALUES (?, ?) "
+                     "ON CONFLICT(provider) DO UPDATE SET next_slot = MAX(next_slot, excluded.next_slot)",
+                     (provider, until))
+    try:
+        _queue_write(push)
+    except sqlite3.Error:
+        pass
+
+def enqueue_artists(artist_map, reset=False):
+    """Add artists as pending work (existing rows are kept unless reset starts a new pass)."""
+    def enqueue(conn):
+        if reset:
+            conn.execute("UPDATE work_queue SET status = 'pending', worker = NULL, lease_expires = NULL, "
+                         "attempts = 0, error = NULL")
+        conn.executemany("INSERT OR IGNORE INTO work_queue (artist, artist_id, status, updated) "
+                         "VALUES (?, ?, 'pending', ?)",
+                         [(name, str(aid), time.time()) for name, aid in artist_map.items()])
+    _queue_write(enqueue)
+
+def lease_next_artist(worker_id=None):
+    """Lease the next pending artist, or one whose previous lease expired (dead worker)."""
+    worker_id = worker_id or queue_worker_id()
+
+    def lease(conn):
+        now = time.time()
+        conn.execute("UPDATE work_queue SET status = 'failed', worker = NULL, error = 'lease expired' "
+                     "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                     (now, QUEUE_MAX_ATTEMPTS))
+        row = conn.execute(
+            "SELECT artist, artist_id, status, worker FROM work_queue "
+            "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ? "
+            "ORDER BY artist LIMIT 1", (now, QUEUE_MAX_ATTEMPTS)
+        ).fetchone()
+        if not row:
+            return None
+        conn.execute("UPDATE work_queue SET status = 'leased', worker = ?, lease_expires = ?, "
+                     "attempts = attempts + 1, updated = ? WHERE artist = ?",
+                     (worker_id, now + QUEUE_LEASE_SECONDS, now, row[0]))
+        conn.execute("UPDATE workers SET current_artist = ? WHERE worker_id = ?", (row[0], worker_id))
+        if row[2] == "leased":
+            conn.execute("UPDATE workers SET current_artist = NULL WHERE worker_id = ? AND current_artist = ?",
+                         (row[3], row[0]))
+            print(f"{LIGHT_YELLOW}♻️ Re-leasing '{row[0]}' from unresponsive worker {row[3]}{RESET}")
+        return row[0], row[1]
+    return _queue_write(lease)
+
+def complete_artist(artist, worker_id=None, error=None):
+    worker_id = worker_id or queue_worker_id()
+
+    def complete(conn):
+        now = time.time()
+        row = conn.execute("SELECT attempts FROM work_queue WHERE artist = ?", (artist,)).fetchone()
+        if error is None:
+            status = "done"
+        else:
+            status = "failed" if row and row[0] >= QUEUE_MAX_ATTEMPTS else "pending"
+        conn.execute("UPDATE work_queue SET status = ?, worker = NULL, lease_expires = NULL, "
+                     "updated = ?, error = ? WHERE artist = ? AND worker = ?",
+                     (status, now, error, artist, worker_id))
+        column = "done_count" if error is None else "failed_count"
+        conn.execute(f"UPDATE workers SET {column} = {column} + 1, current_artist = NULL "
+                     f"WHERE worker_id = ?", (worker_id,))
+    _queue_write(complete)
+
+def queue_heartbeat(worker_id=None):
+    """Mark the worker alive and extend the leases it holds."""
+    worker_id = worker_id or queue_worker_id()
+
+    def beat(conn):
+        now = time.time()
+        conn.execute("INSERT INTO workers (worker_id, started, heartbeat) VALUES (?, ?, ?) "
+                     "ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                     (worker_id, now, now))
+        conn.execute("UPDATE work_queue SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+                     (now + QUEUE_LEASE_SECONDS, worker_id))
+    _queue_write(beat)
+
+def start_queue_heartbeat(worker_id=None):
+    """Background thread that heartbeats for the calling worker thread until the returned Event is set."""
+    worker_id = worker_id or queue_worker_id()
+    stop = threading.Event()
+    queue_heartbeat(worker_id)
+
+    def loop():
+        while not stop.wait(QUEUE_HEARTBEAT_SECONDS):
+            try:
+                queue_heartbeat(worker_id)
+            except sqlite3.Error as e:
+                print(f"⚠️ Heartbeat failed: {type(e).__name__} - {e}")
+
+    threading.Thread(target=loop, name="sptnr-heartbeat", daemon=True).start()
+    return stop
+
+def queue_has_active_leases():
+    row = get_queue_db().execute(
+        "SELECT 1 FROM work_queue WHERE status = 'leased' AND lease_expires >= ? LIMIT 1", (time.time(),)
+    ).fetchone()
+    return row is not None
+
+def get_queue_status():
+    conn = get_queue_db()
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM work_queue GROUP BY status").fetchall())
+    now = time.time()
+    workers = [
+        {"worker": w, "alive": (now - hb) < 3 * QUEUE_HEARTBEAT_SECONDS, "current": cur,
+         "done": done, "failed": failed, "last_heartbeat_s": round(now - hb, 1)}
+        for w, hb, cur, done, failed in conn.execute(
+            "SELECT worker_id, heartbeat, current_artist, done_count, failed_count FROM workers ORDER BY worker_id"
+        ).fetchall()
+    ]
+    return {"counts": counts, "workers": workers}
+
+def print_queue_status():
+    status = get_queue_status()
+    counts = status["counts"]
+    total = sum(counts.values())
+    print(f"\n📋 Work queue: {counts.get('done', 0)}/{total} done | {counts.get('leased', 0)} leased | "
+          f"{counts.get('pending', 0)} pending | {counts.get('failed', 0)} failed")
+    for w in status["workers"]:
+        state = "🟢" if w["alive"] else "🔴"
+        print(f"{state} {w['worker']}: {w['done']} done, {w['failed']} failed"
+              f"{' | now: ' + w['current'] if w['current'] else ''} | heartbeat {w['last_heartbeat_s']}s ago")
+
+# 📓 Run journal: append-only record of completed (artist, album) units for exact resume
+RUN_JOURNAL_FILE = os.path.join(DATA_DIR, "run_journal.jsonl")
+RUN_JOURNAL_MAX_BYTES = 20 * 1024 * 1024    # rotated to .1 when a new run starts
+_journal_lock = threading.Lock()
+current_run_id = None
+
+def journal_append(event, **fields):
+    """Append one record and fsync it, so a crash loses at most the album in progress."""
+    if current_run_id is None:
+        return
+    record = {"event": event, "run": current_run_id,
+              "ts": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"), **fields}
+    with _journal_lock:
+        with open(RUN_JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def start_run_journal(resume_run=None):
+    """Begin (or continue, when resuming) a journaled batch run."""
+    global current_run_id
+    ensure_parent_dir(RUN_JOURNAL_FILE)
+    try:
+        with open(RUN_JOURNAL_FILE, "rb+") as f:     # terminate a record torn by a crash
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    except OSError:
+        pass
+    if resume_run:
+        current_run_id = resume_run
+        return
+    try:
+        if os.path.getsize(RUN_JOURNAL_FILE) > RUN_JOURNAL_MAX_BYTES:
+            os.replace(RUN_JOURNAL_FILE, RUN_JOURNAL_FILE + ".1")
+    except OSError:
+        pass
+    current_run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    journal_append("run_start")
+
+def finish_run_journal():
+    global current_run_id
+    journal_append("run_end")
+    current_run_id = None
+
+def _journal_records_reversed(chunk_size=65536):
+    """Yield journal records newest-first, reading the file backwards in chunks."""
+    try:
+        f = open(RUN_JOURNAL_FILE, "rb")
+    except OSError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines.pop(0)   # may be a partial line; completed by the next chunk
+            for line in reversed(lines):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue   # torn write from a crash
+        if tail.strip():
+            try:
+                yield json.loads(tail)
+            except ValueError:
+                pass
+
+def load_run_progress():
+    """
+    Progress of the most recent journaled run, read newest-first back to its run_start:
+    {"run", "finished", "done_artists", "done_albums": {artist: {album_id: ratings}}, "started": [artists]}.
+    """
+    progress = {"run": None, "finished": False, "done_artists": set(),
+                "done_albums": {}, "started": []}
+    for rec in _journal_records_reversed():
+        event = rec.get("event")
+        if progress["run"] is None:
+            progress["run"] = rec.get("run")
+        elif rec.get("run") != progress["run"]:
+            break
+        if event == "run_end":
+            progress["finished"] = True
+            break
+        if event == "artist_done":
+            progress["done_artists"].add(rec.get("artist"))
+        elif event == "album_done":
+            progress["done_albums"].setdefault(rec.get("artist"), {})[rec.get("album_id")] = rec.get("ratings") or []
+        elif event == "artist_start":
+            progress["started"].append(rec.get("artist"))
+        elif event == "run_start":
+            break
+    return progress
+
+def get_resume_point():
+    """
+    What is left of the last run: {"run", "done_artists", "done_albums"}, or None if it finished.
+    Artists are rated concurrently, so the journal interleaves them; every artist without an
+    artist_done is resumed, each skipping the albums it already journaled.
+    """
+    progress = load_run_progress()
+    if progress["finished"] or progress["run"] is None:
+        return None
+    return {"run": progress["run"], "done_artists": progress["done_artists"],
+            "done_albums": {artist: albums for artist, albums in progress["done_albums"].items()
+                            if artist not in progress["done_artists"]}}
+
+def has_run_journal():
+    return os.path.exists(RUN_JOURNAL_FILE)
+
+def rate_one_artist(name, artist_id, sync=False, verbose=False, force=False, workers=1,
+                    incremental=False, skip_albums=None):
+    """Rate (and with sync, push) one artist inside the run journal; returns the rated track count."""
+    print(f"\n🎧 Processing: {name}")
+    journal_append("artist_start", artist=name)
+    rated = rate_artist(artist_id, name, verbose=verbose, force=force,
+                        workers=workers, incremental=incremental, skip_albums=skip_albums)
+    if sync and rated:
+        sync_to_navidrome(list(rated.values()), name)
+    journal_append("artist_done", artist=name, tracks=len(rated or {}))
+    return len(rated or {})
+
+def batch_rate(sync=False, dry_run=False, force=False, resume_from=None, workers=1, incremental=False,
+               resume_point=None, artist_workers=1, verbose=False):
+    """
+    Rate every artist in the cached index in sorted order, artist_workers at a time.
+    Returns the names of artists that failed; the run journal is only closed when none did.
+    """
+    print(f"\n🔧 Batch config → sync: {sync}, dry_run: {dry_run}, force: {force}, "
+          f"workers: {workers}, artist workers: {artist_workers}, incremental: {incremental}")
 
     artists = fetch_all_artists()
     artist_index = load_artist_index()
 
-    resume_hit = False if resume_from else True
+    library_modified = None
+    if incremental and not force:
+        previous = get_meta("library_last_modified")
+        library_modified = get_library_last_modified(previous)
+        if previous and library_modified is not None and library_modified <= int(previous):
+            stale = stale_album_artists()
+            artists = [a for a in artists if a in stale]
+            print(f"{LIGHT_CYAN}💤 Library unchanged since last pass — refreshing {len(artists)} "
+                  f"artist{'s' if len(artists) != 1 else ''} with stale albums only{RESET}")
+
+    if not dry_run:
+        start_run_journal(resume_point["run"] if resume_point else None)
+
+    queue = []
+    resume_hit = False if resume_from and not resume_point else True
     for name in sorted(artists):
-        # Skip until resume match
+        if resume_point and name in resume_point["done_artists"]:
+            continue
+        # Legacy resume without a journal: skip until the cached artist matches
         if not resume_hit:
             if name.lower() == resume_from.lower():
                 resume_hit = True
@@ -959,23 +3386,63 @@ def batch_rate(sync=False, dry_run=False, force=False, resume_from=None):
             else:
                 continue
 
-        print(f"\n🎧 Processing: {name}")
         artist_id = artist_index.get(name)
         if not artist_id:
             print(f"{LIGHT_RED}⚠️ No ID found for '{name}', skipping.{RESET}")
             continue
-
         if dry_run:
             print(f"{LIGHT_CYAN}👀 Dry run: would scan '{name}' (ID {artist_id}){RESET}")
             continue
+        skip_albums = resume_point["done_albums"].get(name) if resume_point else None
+        queue.append((name, artist_id, skip_albums))
 
-        rated = rate_artist(artist_id, name, verbose=args.verbose, force=force)
-        if sync and rated:
-            sync_to_navidrome(list(rated.values()), name)
-
+    def rate(name, artist_id, skip_albums):
+        rate_one_artist(name, artist_id, sync=sync, verbose=verbose, force=force, workers=workers,
+                        incremental=incremental, skip_albums=skip_albums)
         time.sleep(SLEEP_TIME)
 
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, artist_workers), thread_name_prefix="sptnr-artist") as pool:
+        futures = {pool.submit(rate, *item): item[0] for item in queue}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as err:
+                failed.append(futures[fut])
+                print(f"{LIGHT_RED}⚠️ Error rating {futures[fut]}: {type(err).__name__} - {err}{RESET}")
+
+    if library_modified and not dry_run and not resume_from and not resume_point and not failed:
+        set_meta("library_last_modified", library_modified)
+    if not dry_run and not failed:
+        finish_run_journal()
+
+    print_rate_limiter_state()
+    print_stage_totals()
+    print_metrics_summary(label="batch")
+    if failed:
+        print(f"\n{LIGHT_RED}⚠️ {len(failed)} artist{'s' if len(failed) != 1 else ''} failed: "
+              f"{', '.join(sorted(failed))}{RESET}")
     print(f"\n{LIGHT_GREEN}✅ Batch rating complete.{RESET}")
+    return failed
+
+def find_resume_point():
+    """(journal resume point, artist name) for --resume; the name comes from the legacy cache scan without a journal."""
+    if has_run_journal():
+        point = get_resume_point()
+        if point:
+            partial = len(point["done_albums"])
+            print(f"{LIGHT_CYAN}⏩ Resuming run {point['run']}: {len(point['done_artists'])} "
+                  f"artist{'s' if len(point['done_artists']) != 1 else ''} already done, "
+                  f"{partial} partly done{RESET}")
+            return point, None
+        print(f"{LIGHT_CYAN}✅ Last run completed — starting from beginning of artist list{RESET}")
+        return None, None
+    resume_artist = get_resume_artist_from_cache()
+    if resume_artist:
+        print(f"{LIGHT_CYAN}⏩ Resuming from: {resume_artist}{RESET}")
+    else:
+        print(f"{LIGHT_RED}⚠️ No valid resume point found{RESET}")
+    return None, resume_artist
 
 def run_perpetual_mode():
     while True:
@@ -983,15 +3450,12 @@ def run_perpetual_mode():
         build_artist_index()
 
         resume_artist = None
+        resume_point = None
         if args.artist:
             resume_artist = " ".join(args.artist).strip()
             print(f"{LIGHT_CYAN}⏩ Starting from artist: {resume_artist}{RESET}")
         elif args.resume:
-            resume_artist = get_resume_artist_from_cache()
-            if resume_artist:
-                print(f"{LIGHT_CYAN}⏩ Resuming from: {resume_artist}{RESET}")
-            else:
-                print(f"{LIGHT_RED}⚠️ No valid resume point found{RESET}")
+            resume_point, resume_artist = find_resume_point()
         else:
             print(f"{LIGHT_CYAN}🚀 Starting from beginning of artist list{RESET}")
 
@@ -999,7 +3463,11 @@ def run_perpetual_mode():
             sync=args.sync,
             dry_run=args.dry_run,
             force=args.force,
-            resume_from=resume_artist
+            resume_from=resume_artist,
+            workers=args.workers,
+            incremental=args.incremental,
+            resume_point=resume_point,
+            verbose=args.verbose
         )
 
         print(f"{LIGHT_GREEN}🕒 Scan complete. Sleeping for 12 hours...{RESET}")
@@ -1019,14 +3487,39 @@ if __name__ == "__main__":
     parser.add_argument("--verbose", action="store_true", help="Enable verbose debug output")
     parser.add_argument("--resume", action="store_true", help="Resume batch scan from last synced artist")
     parser.add_argument("--force", action="store_true", help="Force re-scan of all tracks (override cache)")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Recompute stars from stored signals (no network); combine with --artist/--sync/--dry-run")
+    parser.add_argument("--incremental", action="store_true",
+                        default=os.getenv("SPTNR_INCREMENTAL", "0") == "1",
+                        help="Only re-enrich new/changed albums; re-score ones older than ALBUM_STALE_DAYS from stored signals")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SPTNR_WORKERS", "1")),
+                        help="Concurrent per-track lookups within an album (default: 1 = sequential)")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile each artist; stats go to data/profiles (use --workers 1 for full coverage)")
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("SPTNR_METRICS_PORT", "0")),
+                        help="Serve Prometheus metrics on this port (/metrics, /metrics.json)")
 
     args = parser.parse_args()
-
-    if args.refresh or not os.path.exists(INDEX_FILE):
+    # Providers, caches and optional libraries load on first use; --pipeoutput only reads the index
+    if args.pipeoutput is None:
+        init_console()
+    if (args.batchrate and not args.dry_run) or args.perpetual or (args.artist and not args.rescore):
+        require_spotify_credentials()
+    HTTP_CACHE_REFRESH = args.force
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    if args.profile:
+        PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+        if args.workers > 1:
+            print("⚠️ --profile only samples the rating thread; lookups on --workers threads are not profiled")
+
+    if (args.refresh or not has_artist_index()) and not args.rescore:
         build_artist_index()
     if args.pipeoutput is not None:
         pipe_output(args.pipeoutput)
-    elif args.refresh or not os.path.exists(INDEX_FILE):
+    elif args.rescore:
+        rescore_library(artists=args.artist, sync=args.sync, dry_run=args.dry_run)
+    elif args.refresh or not has_artist_index():
         build_artist_index()
     elif args.perpetual:
         run_perpetual_mode()
@@ -1037,12 +3530,18 @@ if __name__ == "__main__":
             if not artist_id:
                 print(f"⚠️ No ID found for '{name}', skipping.")
                 continue
-            rated = rate_artist(artist_id, name, verbose=args.verbose, force=args.force)
-            if args.sync and not args.dry_run:
-                sync_to_navidrome(rated, name)
+            rated = rate_artist(artist_id, name, verbose=args.verbose, force=args.force,
+                                workers=args.workers, incremental=args.incremental)
+            if args.sync and not args.dry_run and rated:
+                sync_to_navidrome(list(rated.values()), name)
             time.sleep(SLEEP_TIME)
+        print_stage_totals()
+        print_metrics_summary()
     elif args.batchrate:
-        batch_rate(sync=args.sync, dry_run=args.dry_run)
+        resume_point, resume_artist = find_resume_point() if args.resume else (None, None)
+        batch_rate(sync=args.sync, dry_run=args.dry_run, force=args.force, workers=args.workers,
+                   incremental=args.incremental, resume_from=resume_artist, resume_point=resume_point,
+                   verbose=args.verbose)
     else:
         print("⚠️ No valid command provided. Try --artist, --batchrate, or --pipeoutput.")
 
@@ -0,0 +1,20 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import sptnr
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Fresh cache store and default feature config for each test."""
+    monkeypatch.setattr(sptnr, "CACHE_DB_FILE", str(tmp_path / "sptnr_cache.db"))
+    monkeypatch.setattr(sptnr, "_cache_db_local", threading.local())
+    monkeypatch.setattr(sptnr, "_cache_db_ready", False)
+    monkeypatch.setattr(sptnr, "_config", {"features": {}})
+    monkeypatch.setattr(sptnr, "METRICS_FILE", str(tmp_path / "sptnr_metrics.prom"))
+    return tmp_path
@@ -0,0 +1,54 @@
+import pytest
+
+import sptnr
+
+SCORES = [90.0, 70.0, 65.0, 60.0, 52.0, 50.0, 48.0, 40.0, 20.0, 5.0,
+          80.0, 30.0, 31.0, 29.0, 28.0, 10.0]
+SINGLES = [False, True, False, False, False, False, False, False, False, False,
+           False, False, False, False, False, True]
+ALBUMS = ["a"] * 10 + ["b"] * 6
+
+
+@pytest.fixture
+def python_only(monkeypatch):
+    monkeypatch.setattr(sptnr, "HAVE_NUMPY", False)
+
+
+@pytest.fixture
+def with_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(sptnr, "HAVE_NUMPY", None)     # have_numpy() imports it again
+    monkeypatch.setattr(sptnr, "np", None)
+    assert sptnr.have_numpy()
+
+
+def test_band_scores_without_numpy(python_only):
+    stars, stats = sptnr.band_scores(SCORES, SINGLES, ALBUMS)
+
+    assert stars[1] == 5 and stars[15] == 5                 # singles
+    assert all(1 <= s <= 4 for s, single in zip(stars, SINGLES) if not single)
+    assert stars[0] >= stars[5] >= stars[9]                 # ordered within an album
+    non_singles_a = [s for s, single, album in zip(stars, SINGLES, ALBUMS) if album == "a" and not single]
+    assert non_singles_a.count(4) <= max(1, round(len(non_singles_a) * 0.25))
+    assert set(stats) == {"a", "b"}
+
+
+def test_band_scores_single_album_without_numpy(python_only):
+    stars, stats = sptnr.band_scores(SCORES[:10], SINGLES[:10])
+
+    assert stars == sptnr.band_scores(SCORES, SINGLES, ALBUMS)[0][:10]
+    assert len(stats) == 1
+
+
+def test_band_scores_empty(python_only):
+    assert sptnr.band_scores([], []) == ([], {})
+
+
+def test_band_scores_numpy_matches_python(monkeypatch, with_numpy):
+    with_numpy_result = sptnr.band_scores(SCORES, SINGLES, ALBUMS)
+    monkeypatch.setattr(sptnr, "HAVE_NUMPY", False)
+    python_result = sptnr.band_scores(SCORES, SINGLES, ALBUMS)
+
+    assert with_numpy_result[0] == python_result[0]
+    for album, (med, mad) in python_result[1].items():
+        assert with_numpy_result[1][album] == pytest.approx((med, mad))
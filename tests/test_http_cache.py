@@ -0,0 +1,89 @@
+import json
+
+import pytest
+import requests
+
+import sptnr
+
+
+def response(status, payload):
+    res = requests.Response()
+    res.status_code = status
+    res._content = json.dumps(payload).encode("utf-8")
+    res.headers["Content-Type"] = "application/json"
+    return res
+
+
+@pytest.fixture
+def upstream(store, monkeypatch):
+    """Replace the network with queued responses; records every request that reached it."""
+    monkeypatch.setattr(sptnr, "_http_cache_pruned", True)
+    monkeypatch.setattr(sptnr, "HTTP_CACHE_REFRESH", False)
+    calls, replies = [], []
+
+    def fake_request(provider, method, url, **kwargs):
+        calls.append(url)
+        return replies.pop(0)
+    monkeypatch.setattr(sptnr, "http_request", fake_request)
+    return calls, replies
+
+
+@pytest.mark.parametrize("payload,kind", [
+    ({"error": 6, "message": "Track not found"}, "empty"),
+    ({"error": 29, "message": "Rate limit exceeded"}, "error"),
+    ({"toptracks": {"track": []}}, "empty"),
+    ({"results": []}, "empty"),
+    ([], "empty"),
+    ({"toptracks": {"track": [{"name": "Song"}]}}, "ok"),
+])
+def test_classify_payload(payload, kind):
+    assert sptnr._classify_payload(json.dumps(payload).encode("utf-8")) == kind
+
+
+def test_classify_payload_non_json():
+    assert sptnr._classify_payload(b"<html>") == "ok"
+
+
+def test_empty_result_is_negative_cached(upstream):
+    calls, replies = upstream
+    replies.append(response(200, {"results": []}))
+
+    for _ in range(2):
+        res = sptnr.cached_http_get("discogs", "https://api.discogs.com/database/search", 3600, 600,
+                                    params={"q": "nothing"})
+        assert res.json() == {"results": []}
+    assert len(calls) == 1
+
+
+def test_not_found_is_negative_cached(upstream):
+    calls, replies = upstream
+    replies.append(response(404, {}))
+
+    for _ in range(2):
+        assert sptnr.cached_http_get("musicbrainz", "https://musicbrainz.org/ws/2/artist/x",
+                                     3600, 600).status_code == 404
+    assert len(calls) == 1
+
+
+def test_zero_negative_ttl_skips_caching_misses(upstream):
+    calls, replies = upstream
+    replies += [response(200, {"results": []}), response(200, {"results": []})]
+
+    for _ in range(2):
+        sptnr.cached_http_get("discogs", "https://api.discogs.com/database/search", 3600, 0)
+    assert len(calls) == 2
+
+
+def test_error_bodies_are_not_cached(upstream):
+    calls, replies = upstream
+    replies += [response(200, {"error": 29, "message": "Rate limit exceeded"}),
+                response(200, {"track": {"playcount": "5"}})]
+
+    first = sptnr.cached_http_get("lastfm", "https://ws.audioscrobbler.com/2.0/", 3600, 600,
+                                  params={"method": "track.getInfo"})
+    second = sptnr.cached_http_get("lastfm", "https://ws.audioscrobbler.com/2.0/", 3600, 600,
+                                   params={"method": "track.getInfo"})
+
+    assert first.json()["error"] == 29
+    assert second.json() == {"track": {"playcount": "5"}}
+    assert len(calls) == 2
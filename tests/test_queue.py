@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+import sptnr
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(sptnr, "QUEUE_DB_FILE", str(tmp_path / "sptnr_queue.db"))
+    monkeypatch.setattr(sptnr, "_queue_db_local", threading.local())
+    sptnr.enqueue_artists({"Alpha": 1, "Bravo": 2, "Charlie": 3})
+    return tmp_path
+
+
+def expire_leases():
+    sptnr.get_queue_db().execute("UPDATE work_queue SET lease_expires = 0 WHERE status = 'leased'")
+
+
+def test_each_worker_thread_holds_its_own_lease(queue):
+    leased = {}
+
+    def work(n):
+        sptnr.queue_heartbeat()
+        leased[n] = (sptnr.queue_worker_id(), sptnr.lease_next_artist())
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert {artist for _, (artist, _) in leased.values()} == {"Alpha", "Bravo"}
+    current = {w["worker"]: w["current"] for w in sptnr.get_queue_status()["workers"]}
+    assert current == {worker: artist for worker, (artist, _) in leased.values()}
+
+
+def test_complete_marks_done_and_drains(queue):
+    while (item := sptnr.lease_next_artist()) is not None:
+        sptnr.complete_artist(item[0])
+
+    assert sptnr.get_queue_status()["counts"] == {"done": 3}
+    assert not sptnr.queue_has_active_leases()
+
+
+def test_expired_lease_is_re_leased(queue):
+    assert sptnr.lease_next_artist(worker_id="dead-worker") == ("Alpha", "1")
+    expire_leases()
+
+    assert sptnr.lease_next_artist(worker_id="live-worker") == ("Alpha", "1")
+    sptnr.complete_artist("Alpha", worker_id="dead-worker")      # a late completion is ignored
+    assert sptnr.get_queue_status()["counts"]["leased"] == 1
+
+
+def test_failing_artist_gives_up_after_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(sptnr, "QUEUE_MAX_ATTEMPTS", 2)
+    for _ in range(2):
+        artist, _ = sptnr.lease_next_artist()
+        assert artist == "Alpha"
+        sptnr.complete_artist(artist, error="RuntimeError: boom")
+
+    assert sptnr.lease_next_artist()[0] == "Bravo"
+    assert sptnr.get_queue_status()["counts"]["failed"] == 1
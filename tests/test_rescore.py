@@ -0,0 +1,46 @@
+import sptnr
+
+
+def stored_album(album_id, n=8, stars=3):
+    return [{
+        "id": f"{album_id}-{i}", "artist": "Synthetic", "album": album_id, "title": f"Track {i}",
+        "spotify_score": 10.0 * (n - i), "spotify_popularity": 10 * (n - i),
+        "lastfm_ratio": 0.5 * (n - i), "listenbrainz_score": float(n - i), "age_score": 1.0,
+        "is_single": i == 0, "single_sources": ["discogs"] if i == 0 else [],
+        "score": 50.0, "stars": stars, "last_scanned": "2026-01-01T00:00:00",
+    } for i in range(n)]
+
+
+def test_rescore_library_bands_stored_signals(store):
+    sptnr.save_track_signals("al-1", stored_album("al-1"))
+    sptnr.save_track_signals("al-2", stored_album("al-2"))
+
+    changed = sptnr.rescore_library()
+
+    stars = {t["id"]: t["stars"] for t in sptnr.load_track_signals()}
+    assert stars["al-1-0"] == 5                      # stored single verdict is kept
+    assert stars["al-1-1"] > stars["al-1-7"]        # strongest signals band highest
+    assert set(changed) == {tid for tid, s in stars.items() if s != 3}
+
+
+def test_rescore_library_dry_run_saves_nothing(store):
+    sptnr.save_track_signals("al-1", stored_album("al-1"))
+
+    changed = sptnr.rescore_library(dry_run=True)
+
+    assert changed
+    assert {t["stars"] for t in sptnr.load_track_signals()} == {3}
+
+
+def test_rescore_library_filters_artists(store):
+    sptnr.save_track_signals("al-1", stored_album("al-1"))
+
+    assert sptnr.rescore_library(artists=["Someone Else"]) == {}
+
+
+def test_compute_adaptive_weights_clamps_to_range():
+    tracks = stored_album("al-1")
+    base = {"spotify": 0.5, "lastfm": 0.5, "listenbrainz": 0.2}
+    weights = sptnr.compute_adaptive_weights(tracks, base, clamp=(0.75, 1.25))
+    for name, w in weights.items():
+        assert 0.75 * base[name] <= w <= 1.25 * base[name]
@@ -0,0 +1,59 @@
+import sptnr
+
+
+def journal_run(*records):
+    """Write one unfinished run, as concurrent artist workers would have journaled it."""
+    sptnr.start_run_journal()
+    for event, fields in records:
+        sptnr.journal_append(event, **fields)
+    sptnr.current_run_id = None        # the process "crashed" here
+
+
+def interleaved_run():
+    journal_run(
+        ("artist_start", {"artist": "Alpha"}),
+        ("artist_start", {"artist": "Charlie"}),
+        ("album_done", {"artist": "Alpha", "album_id": "a-1", "ratings": [{"id": "t1", "stars": 4}]}),
+        ("artist_done", {"artist": "Charlie", "tracks": 10}),
+        ("artist_start", {"artist": "Delta"}),
+        ("album_done", {"artist": "Delta", "album_id": "d-1", "ratings": []}),
+    )
+
+
+def test_resume_point_covers_every_unfinished_artist(store, monkeypatch):
+    monkeypatch.setattr(sptnr, "RUN_JOURNAL_FILE", str(store / "run_journal.jsonl"))
+    interleaved_run()
+
+    point = sptnr.get_resume_point()
+
+    assert point["done_artists"] == {"Charlie"}
+    assert point["done_albums"] == {"Alpha": {"a-1": [{"id": "t1", "stars": 4}]}, "Delta": {"d-1": []}}
+
+
+def test_finished_run_has_no_resume_point(store, monkeypatch):
+    monkeypatch.setattr(sptnr, "RUN_JOURNAL_FILE", str(store / "run_journal.jsonl"))
+    sptnr.start_run_journal()
+    sptnr.journal_append("artist_done", artist="Alpha")
+    sptnr.finish_run_journal()
+
+    assert sptnr.get_resume_point() is None
+
+
+def test_batch_rate_resumes_from_a_concurrent_journal(store, monkeypatch):
+    monkeypatch.setattr(sptnr, "RUN_JOURNAL_FILE", str(store / "run_journal.jsonl"))
+    sptnr.save_artist_index({name: name.lower() for name in ("Alpha", "Bravo", "Charlie", "Delta", "Echo")})
+    interleaved_run()
+    rated = {}
+
+    def fake_rate_artist(artist_id, artist_name, **kwargs):
+        rated[artist_name] = kwargs.get("skip_albums")
+        return {}
+    monkeypatch.setattr(sptnr, "rate_artist", fake_rate_artist)
+
+    point, artist = sptnr.find_resume_point()
+    failed = sptnr.batch_rate(resume_point=point, resume_from=artist, artist_workers=2)
+
+    assert failed == []
+    assert rated == {"Alpha": {"a-1": [{"id": "t1", "stars": 4}]}, "Bravo": None,
+                     "Delta": {"d-1": []}, "Echo": None}
+    assert sptnr.get_resume_point() is None      # the resumed run closed its journal